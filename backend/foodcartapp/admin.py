@@ -1,25 +1,92 @@
+import re
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.utils.functional import cached_property
 from django.shortcuts import reverse
 from django.templatetags.static import static
 from django.utils.html import format_html
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.shortcuts import redirect
 
-from .models import Product, Order, OrderItem
+from .models import ArchivedOrder, ArchivedOrderItem, Banner, Product, Order, OrderItem
 from .models import ProductCategory
 from .models import Restaurant
 from .models import RestaurantMenuItem
 
 
-class RestaurantMenuItemInline(admin.TabularInline):
+PHONE_SEARCH_TERM = re.compile(r'\+?[\d\s()-]{5,}')
+
+ESTIMATED_COUNT_THRESHOLD = 100000
+
+
+def get_estimated_count(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.where:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        estimated_count = get_estimated_count(self.object_list)
+        if estimated_count is not None and estimated_count >= ESTIMATED_COUNT_THRESHOLD:
+            return estimated_count
+        return super().count
+
+
+def get_phone_search_term(search_term):
+    if not PHONE_SEARCH_TERM.fullmatch(search_term):
+        return None
+    digits = re.sub(r'\D', '', search_term)
+    if len(digits) < 5:
+        return None
+    if len(digits) == 11 and digits.startswith('8'):
+        digits = f'7{digits[1:]}'
+    return digits
+
+
+class CachedChoicesInlineMixin:
+    cached_choices_fields = ()
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request, **kwargs)
+        if db_field.name in self.cached_choices_fields and request is not None:
+            choices_cache = request.__dict__.setdefault('admin_choices_cache', {})
+            cache_key = (db_field.model, db_field.name)
+            if cache_key not in choices_cache:
+                choices_cache[cache_key] = list(formfield.choices)
+            formfield.choices = choices_cache[cache_key]
+        return formfield
+
+
+class RestaurantMenuItemInline(CachedChoicesInlineMixin, admin.TabularInline):
     model = RestaurantMenuItem
     extra = 0
+    cached_choices_fields = ('restaurant', 'product')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('restaurant', 'product')
 
 
-class OrderItemInline(admin.TabularInline):
+class OrderItemInline(CachedChoicesInlineMixin, admin.TabularInline):
     model = OrderItem
     fields = ('product', 'quantity')
     extra = 0
+    cached_choices_fields = ('product', )
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
 
 
 @admin.register(Restaurant)
@@ -50,12 +117,15 @@ class ProductAdmin(admin.ModelAdmin):
     list_display_links = [
         'name',
     ]
+    list_select_related = [
+        'category',
+    ]
     list_filter = [
         'category',
     ]
     search_fields = [
-        # FIXME SQLite can not convert letter case for cyrillic words properly, so search will be buggy.
-        # Migration to PostgreSQL is necessary
+        # SQLite can not convert letter case for cyrillic words properly, so search will be buggy there.
+        # On PostgreSQL these lookups use the pg_trgm indexes from migration 0062
         'name',
         'category__name',
     ]
@@ -109,6 +179,42 @@ class ProductAdmin(admin.ModelAdmin):
     get_image_list_preview.short_description = 'превью'
 
 
+@admin.register(Banner)
+class BannerAdmin(admin.ModelAdmin):
+    list_display = [
+        'get_image_list_preview',
+        'title',
+        'text',
+        'position',
+        'is_active',
+    ]
+    list_display_links = [
+        'title',
+    ]
+    list_editable = [
+        'position',
+        'is_active',
+    ]
+    list_filter = [
+        'is_active',
+    ]
+    readonly_fields = [
+        'get_image_preview',
+    ]
+
+    def get_image_preview(self, obj):
+        if not obj.image:
+            return 'выберите картинку'
+        return format_html('<img src="{url}" style="max-height: 200px;"/>', url=obj.image.url)
+    get_image_preview.short_description = 'превью'
+
+    def get_image_list_preview(self, obj):
+        if not obj.image:
+            return 'нет картинки'
+        return format_html('<img src="{src}" style="max-height: 50px;"/>', src=obj.image.url)
+    get_image_list_preview.short_description = 'превью'
+
+
 @admin.register(ProductCategory)
 class ProductAdmin(admin.ModelAdmin):
     pass
@@ -117,7 +223,42 @@ class ProductAdmin(admin.ModelAdmin):
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderItemInline, ]
-    list_display = ('created_at', )
+    list_display = ('id', 'created_at', 'status', 'restaurant', 'items_count', 'total_price')
+    list_select_related = ('restaurant', )
+    list_filter = ('status', )
+    readonly_fields = ('total_price', )
+    search_fields = ('phonenumber', 'address')
+    search_help_text = 'Телефон или адрес'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        items_count = (
+            OrderItem.objects
+            .filter(order=OuterRef('pk'))
+            .order_by()
+            .values('order')
+            .annotate(items_count=Count('id'))
+            .values('items_count')
+        )
+        return super().get_queryset(request).annotate(items_count=Subquery(items_count))
+
+    @admin.display(description='позиций', ordering='items_count')
+    def items_count(self, obj):
+        return obj.items_count or 0
+
+    def get_search_results(self, request, queryset, search_term):
+        phone_search_term = get_phone_search_term(search_term.strip())
+        if phone_search_term:
+            return queryset.filter(
+                Q(phonenumber__icontains=phone_search_term) | Q(address__icontains=search_term)
+            ), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        Order.objects.filter(pk=form.instance.pk).recalculate_total_price()
+        form.instance.refresh_from_db(fields=['total_price'])
 
     def response_change(self, request, obj):
         if '_continue' not in request.POST and '_addanother' not in request.POST:
@@ -131,3 +272,65 @@ class OrderAdmin(admin.ModelAdmin):
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ['order', 'product', 'quantity']
+    list_select_related = ['order', 'product']
+    raw_id_fields = ['order']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        order_ids = {obj.order_id}
+        if change and 'order' in form.changed_data:
+            order_ids.add(form.initial['order'])
+        Order.objects.filter(pk__in=order_ids).recalculate_total_price()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Order.objects.filter(pk=obj.order_id).recalculate_total_price()
+
+    def delete_queryset(self, request, queryset):
+        order_ids = set(queryset.values_list('order_id', flat=True))
+        super().delete_queryset(request, queryset)
+        Order.objects.filter(pk__in=order_ids).recalculate_total_price()
+
+
+class ArchivedOrderItemInline(admin.TabularInline):
+    model = ArchivedOrderItem
+    fields = ('product', 'quantity', 'price')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(admin.ModelAdmin):
+    inlines = [ArchivedOrderItemInline, ]
+    list_display = ('id', 'created_at', 'delivered_at', 'total_price', 'phonenumber', 'address')
+    search_fields = ('phonenumber', 'address')
+    search_help_text = 'Телефон или адрес'
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        phone_search_term = get_phone_search_term(search_term.strip())
+        if phone_search_term:
+            return queryset.filter(
+                Q(phonenumber__icontains=phone_search_term) | Q(address__icontains=search_term)
+            ), False
+        return super().get_search_results(request, queryset, search_term)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,68 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+
+
+ARCHIVED_ORDER_FIELDS = [
+    'id',
+    'firstname',
+    'lastname',
+    'phonenumber',
+    'address',
+    'status',
+    'comment',
+    'total_price',
+    'created_at',
+    'called_at',
+    'delivered_at',
+    'payment',
+    'restaurant_id',
+    'location_id',
+]
+
+
+def get_archivable_orders(completed_before):
+    return Order.objects.filter(status='completed').filter(
+        Q(delivered_at__lt=completed_before)
+        | Q(delivered_at__isnull=True, created_at__lt=completed_before)
+    )
+
+
+def archive_orders_batch(completed_before, batch_size=500):
+    with transaction.atomic():
+        orders = list(
+            get_archivable_orders(completed_before)
+            .select_for_update(skip_locked=True)
+            .order_by('id')
+            .values(*ARCHIVED_ORDER_FIELDS)[:batch_size]
+        )
+        if not orders:
+            return 0
+
+        order_ids = [order['id'] for order in orders]
+        items = OrderItem.objects.filter(order_id__in=order_ids).values(
+            'order_id', 'product_id', 'quantity', 'price'
+        )
+
+        archived_at = timezone.now()
+        ArchivedOrder.objects.bulk_create([
+            ArchivedOrder(**order, archived_at=archived_at)
+            for order in orders
+        ])
+        ArchivedOrderItem.objects.bulk_create([
+            ArchivedOrderItem(**item) for item in items
+        ])
+
+        OrderItem.objects.filter(order_id__in=order_ids).delete()
+        Order.objects.filter(id__in=order_ids).delete()
+    return len(orders)
+
+
+def get_orders_with_archive(*fields):
+    fields = fields or ARCHIVED_ORDER_FIELDS
+    return (
+        Order.objects.order_by().values(*fields)
+        .union(ArchivedOrder.objects.order_by().values(*fields), all=True)
+    )
@@ -0,0 +1,93 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .availability import get_availability_index
+from .matching import RestaurantMatcher, get_point
+from .models import Order, Restaurant
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ['confirmed', 'assembled', 'delivering']
+
+
+def get_restaurant_loads():
+    loads = (
+        Order.objects
+        .filter(status__in=ACTIVE_STATUSES, restaurant__isnull=False)
+        .values('restaurant')
+        .annotate(orders_count=Count('id'))
+        .values_list('restaurant', 'orders_count')
+    )
+    return dict(loads)
+
+
+def assign_batch(orders, restaurants, loads):
+    eligible = get_availability_index().eligible_matrix(
+        [[item.product_id for item in order.items.all()] for order in orders],
+        [restaurant.id for restaurant in restaurants],
+    )
+    matcher = RestaurantMatcher(restaurants)
+    _, candidates = matcher.match(
+        [get_point(order.location) for order in orders],
+        eligible,
+        max_distance_km=settings.DELIVERY_RADIUS_KM,
+    )
+
+    now = timezone.now()
+    assigned_orders = []
+    for order, order_candidates in zip(orders, candidates):
+        for restaurant, _ in order_candidates:
+            load = loads.get(restaurant.id, 0)
+            if restaurant.max_active_orders is not None and load >= restaurant.max_active_orders:
+                continue
+            order.restaurant = restaurant
+            order.status = 'confirmed'
+            if not order.called_at:
+                order.called_at = now
+            loads[restaurant.id] = load + 1
+            assigned_orders.append(order)
+            break
+
+    Order.objects.bulk_update(assigned_orders, ['restaurant', 'status', 'called_at'])
+    return assigned_orders
+
+
+def assign_unprocessed_orders(batch_size=200):
+    restaurants = list(Restaurant.objects.select_related('location'))
+    loads = get_restaurant_loads()
+
+    processed_count = 0
+    assigned_count = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            orders = list(
+                Order.objects
+                .filter(
+                    id__gt=last_id,
+                    status='unprocessed',
+                    restaurant__isnull=True,
+                    location__lat__isnull=False,
+                    location__lon__isnull=False,
+                )
+                .select_related('location')
+                .prefetch_related('items')
+                .select_for_update(skip_locked=True, of=('self',))
+                .order_by('id')[:batch_size]
+            )
+            if not orders:
+                break
+            assigned_orders = assign_batch(orders, restaurants, loads)
+
+        processed_count += len(orders)
+        assigned_count += len(assigned_orders)
+        last_id = orders[-1].id
+
+    if processed_count:
+        logger.info(f"Назначено ресторанов: {assigned_count} из {processed_count} заказов")
+    return processed_count, assigned_count
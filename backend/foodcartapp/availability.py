@@ -0,0 +1,89 @@
+import numpy as np
+from django.core.cache import cache
+
+from star_burger.db_router import read_from_primary
+
+from .models import Restaurant, RestaurantMenuItem
+
+
+AVAILABILITY_INDEX_CACHE_KEY = 'foodcartapp:availability_index'
+
+
+class AvailabilityIndex:
+    def __init__(self, restaurant_ids, masks):
+        self.restaurant_ids = list(restaurant_ids)
+        self.positions = {
+            restaurant_id: position
+            for position, restaurant_id in enumerate(self.restaurant_ids)
+        }
+        self.masks = masks
+        self.all_restaurants_mask = (1 << len(self.restaurant_ids)) - 1
+
+    @classmethod
+    def build(cls):
+        restaurant_ids = list(
+            Restaurant.objects.order_by('id').values_list('id', flat=True)
+        )
+        positions = {
+            restaurant_id: position
+            for position, restaurant_id in enumerate(restaurant_ids)
+        }
+        menu_items = (
+            RestaurantMenuItem.objects
+            .filter(availability=True)
+            .values_list('product_id', 'restaurant_id')
+        )
+
+        masks = {}
+        for product_id, restaurant_id in menu_items:
+            masks[product_id] = masks.get(product_id, 0) | 1 << positions[restaurant_id]
+        return cls(restaurant_ids, masks)
+
+    def eligible_mask(self, product_ids):
+        mask = self.all_restaurants_mask
+        for product_id in product_ids:
+            mask &= self.masks.get(product_id, 0)
+            if not mask:
+                break
+        return mask
+
+    def is_eligible(self, mask, restaurant_id):
+        position = self.positions.get(restaurant_id)
+        return position is not None and bool(mask >> position & 1)
+
+    def restaurant_ids_for(self, mask):
+        return [
+            restaurant_id
+            for position, restaurant_id in enumerate(self.restaurant_ids)
+            if mask >> position & 1
+        ]
+
+    def eligible_matrix(self, product_id_lists, restaurant_ids):
+        masks = [self.eligible_mask(product_ids) for product_ids in product_id_lists]
+        mask_size = max(1, (len(self.restaurant_ids) + 7) // 8)
+        raw_masks = b''.join(mask.to_bytes(mask_size, 'little') for mask in masks)
+        bits = np.unpackbits(
+            np.frombuffer(raw_masks, dtype=np.uint8).reshape(len(masks), mask_size),
+            axis=1,
+            bitorder='little',
+        ).astype(bool)
+
+        matrix = np.zeros((len(masks), len(restaurant_ids)), dtype=bool)
+        for column, restaurant_id in enumerate(restaurant_ids):
+            position = self.positions.get(restaurant_id)
+            if position is not None:
+                matrix[:, column] = bits[:, position]
+        return matrix
+
+
+def get_availability_index():
+    index = cache.get(AVAILABILITY_INDEX_CACHE_KEY)
+    if index is None:
+        with read_from_primary():
+            index = AvailabilityIndex.build()
+        cache.set(AVAILABILITY_INDEX_CACHE_KEY, index, None)
+    return index
+
+
+def invalidate_availability_index():
+    cache.delete(AVAILABILITY_INDEX_CACHE_KEY)
@@ -0,0 +1,41 @@
+from django.core.cache import cache
+
+from .models import Banner
+from .renderers import dumps
+
+
+BANNERS_VERSION_CACHE_KEY = 'foodcartapp:banners_version'
+BANNERS_CACHE_TTL = 60 * 60 * 24
+
+
+def get_banners_cache_key(version):
+    return f'foodcartapp:banners:{version}'
+
+
+def serialize_banner(banner):
+    return {
+        'title': banner.title,
+        'src': banner.image.url,
+        'text': banner.text,
+    }
+
+
+def build_banners():
+    return dumps([serialize_banner(banner) for banner in Banner.objects.active()])
+
+
+def get_banners():
+    version = cache.get_or_set(BANNERS_VERSION_CACHE_KEY, 1, None)
+    cache_key = get_banners_cache_key(version)
+    content = cache.get(cache_key)
+    if content is None:
+        content = build_banners()
+        cache.set(cache_key, content, BANNERS_CACHE_TTL)
+    return content
+
+
+def invalidate_banners():
+    try:
+        cache.incr(BANNERS_VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(BANNERS_VERSION_CACHE_KEY, 1, None)
@@ -0,0 +1,231 @@
+import json
+import math
+import os
+import random
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from .models import (
+    Order,
+    OrderItem,
+    Place,
+    Product,
+    ProductCategory,
+    Restaurant,
+    RestaurantMenuItem,
+)
+
+
+FIXTURE_PATH = os.path.join(settings.BASE_DIR, 'dump_data.json')
+
+MOSCOW_CENTER = (55.751244, 37.618423)
+
+
+def load_fixture_templates(path=FIXTURE_PATH):
+    with open(path, encoding='utf-8') as fixture_file:
+        fixture = json.load(fixture_file)
+
+    templates = {}
+    for record in fixture:
+        templates.setdefault(record['model'], []).append(record['fields'])
+    return templates
+
+
+def random_point(rng, spread=0.15):
+    lat, lon = MOSCOW_CENTER
+    return (
+        lat + rng.uniform(-spread, spread),
+        lon + rng.uniform(-spread * 2, spread * 2),
+    )
+
+
+def generate_data(restaurants=10, products=50, orders=1000, seed=0):
+    rng = random.Random(seed)
+    templates = load_fixture_templates()
+
+    categories = ProductCategory.objects.bulk_create([
+        ProductCategory(name=fields['name'])
+        for fields in templates['foodcartapp.productcategory']
+    ])
+
+    restaurant_places = Place.objects.bulk_create([
+        Place(
+            address=f'бенчмарк ресторан {number}',
+            lat=lat,
+            lon=lon,
+        )
+        for number, (lat, lon) in enumerate(
+            random_point(rng) for _ in range(restaurants)
+        )
+    ])
+    restaurant_templates = templates['foodcartapp.restaurant']
+    created_restaurants = Restaurant.objects.bulk_create([
+        Restaurant(
+            name=f'{restaurant_templates[number % len(restaurant_templates)]["name"]} {number}',
+            address=place.address,
+            contact_phone=restaurant_templates[number % len(restaurant_templates)]['contact_phone'],
+            location=place,
+        )
+        for number, place in enumerate(restaurant_places)
+    ])
+
+    product_templates = templates['foodcartapp.product']
+    created_products = Product.objects.bulk_create([
+        Product(
+            name=f'{product_templates[number % len(product_templates)]["name"]} {number}',
+            category=rng.choice(categories),
+            price=Decimal(product_templates[number % len(product_templates)]['price']),
+            image=product_templates[number % len(product_templates)]['image'],
+            description=product_templates[number % len(product_templates)]['description'],
+        )
+        for number in range(products)
+    ])
+
+    RestaurantMenuItem.objects.bulk_create([
+        RestaurantMenuItem(
+            restaurant=restaurant,
+            product=product,
+            availability=rng.random() < 0.8,
+        )
+        for restaurant in created_restaurants
+        for product in created_products
+    ])
+
+    order_places = Place.objects.bulk_create([
+        Place(
+            address=f'бенчмарк заказ {number}',
+            lat=lat,
+            lon=lon,
+        )
+        for number, (lat, lon) in enumerate(
+            random_point(rng) for _ in range(orders)
+        )
+    ])
+    statuses = [status for status, _ in Order.STATUS_CHOICES]
+    payments = [payment for payment, _ in Order.PAYMENT_CHOICES]
+    orders_items = [
+        [
+            (product, rng.randint(1, 3))
+            for product in rng.sample(created_products, rng.randint(1, min(5, products)))
+        ]
+        for _ in order_places
+    ]
+    created_orders = Order.objects.bulk_create([
+        Order(
+            firstname='Иван',
+            lastname=f'Бенчмарков {number}',
+            phonenumber='+79291234567',
+            address=place.address,
+            status=rng.choice(statuses),
+            payment=rng.choice(payments),
+            location=place,
+            total_price=sum(product.price * quantity for product, quantity in items),
+        )
+        for number, (place, items) in enumerate(zip(order_places, orders_items))
+    ])
+
+    order_items = [
+        OrderItem(
+            order=order,
+            product=product,
+            quantity=quantity,
+            price=product.price,
+        )
+        for order, items in zip(created_orders, orders_items)
+        for product, quantity in items
+    ]
+    OrderItem.objects.bulk_create(order_items)
+
+    return {
+        'restaurants': restaurants,
+        'products': products,
+        'orders': orders,
+        'order_items': len(order_items),
+    }
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    rank = max(0, math.ceil(share * len(ordered)) - 1)
+    return ordered[rank]
+
+
+def perform(name, make_request):
+    response = make_request()
+    if response.streaming:
+        b''.join(response.streaming_content)
+    if response.status_code >= 400:
+        raise RuntimeError(f'{name}: ответ {response.status_code}')
+
+
+def measure(name, make_request, iterations):
+    timings = []
+    query_counts = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as queries:
+            started_at = time.perf_counter()
+            perform(name, make_request)
+            timings.append(time.perf_counter() - started_at)
+        query_counts.append(len(queries))
+
+    tracemalloc.start()
+    try:
+        perform(name, make_request)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+        'max_queries': max(query_counts),
+        'peak_memory_kb': round(peak_memory / 1024, 1),
+    }
+
+
+def run_scenarios(iterations=20, seed=0):
+    rng = random.Random(seed)
+    product_ids = list(Product.objects.available().values_list('id', flat=True))
+
+    manager = get_user_model().objects.create_superuser(
+        'benchmark', 'benchmark@example.com', 'benchmark'
+    )
+    client = Client()
+    client.force_login(manager)
+
+    def register_order():
+        payload = {
+            'firstname': 'Иван',
+            'lastname': 'Бенчмарков',
+            'phonenumber': '+79291234567',
+            'address': f'Москва, ул. Бенчмарковая, {rng.randint(1, 10000)}',
+            'products': [
+                {'product': product_id, 'quantity': rng.randint(1, 3)}
+                for product_id in rng.sample(product_ids, min(3, len(product_ids)))
+            ],
+        }
+        return client.post(
+            '/api/order/',
+            json.dumps(payload),
+            content_type='application/json',
+        )
+
+    scenarios = {
+        'product_list_api': lambda: client.get('/api/products/'),
+        'register_order': register_order,
+        'view_orders': lambda: client.get('/manager/orders/'),
+        'view_products': lambda: client.get('/manager/products/'),
+    }
+
+    return {
+        name: measure(name, make_request, iterations)
+        for name, make_request in scenarios.items()
+    }
@@ -0,0 +1,47 @@
+import hashlib
+
+from django.core.cache import cache
+
+from .models import Product
+from .renderers import dumps
+
+
+CATALOG_CACHE_KEY = 'foodcartapp:product_catalog'
+
+
+def serialize_product(product):
+    return {
+        'id': product.id,
+        'name': product.name,
+        'price': product.price,
+        'special_status': product.special_status,
+        'description': product.description,
+        'category': {
+            'id': product.category.id,
+            'name': product.category.name,
+        } if product.category else None,
+        'image': product.image.url,
+        'restaurant': {
+            'id': product.id,
+            'name': product.name,
+        }
+    }
+
+
+def build_catalog():
+    products = Product.objects.select_related('category').available()
+    content = dumps([serialize_product(product) for product in products])
+    etag = f'"{hashlib.sha256(content).hexdigest()}"'
+    return content, etag
+
+
+def get_catalog():
+    catalog = cache.get(CATALOG_CACHE_KEY)
+    if catalog is None:
+        catalog = build_catalog()
+        cache.set(CATALOG_CACHE_KEY, catalog, None)
+    return catalog
+
+
+def invalidate_catalog():
+    cache.delete(CATALOG_CACHE_KEY)
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+
+GEOCODER_API_URL = 'https://geocode-maps.yandex.ru/1.x'
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class GeocoderError(Exception):
+    pass
+
+
+def parse_coordinates(geo_data):
+    features = geo_data.get("response", {}).get("GeoObjectCollection", {}).get("featureMember", [])
+    if not features:
+        return None, None
+
+    coords = features[0]["GeoObject"]["Point"]["pos"]
+    lon, lat = map(float, coords.split(' '))
+    return lat, lon
+
+
+class AsyncGeocoder:
+    def __init__(self, api_key, api_url=GEOCODER_API_URL, concurrency=5,
+                 max_retries=3, timeout=10, backoff_base=0.5, backoff_max=8,
+                 rate_limit=None):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client = None
+        self.semaphore = None
+        self.rate_lock = None
+        self.next_request_at = 0
+
+    async def __aenter__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+        self.rate_lock = asyncio.Lock()
+        self.client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(
+                max_connections=self.concurrency,
+                max_keepalive_connections=self.concurrency,
+            ),
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+
+    def get_backoff_delay(self, attempt):
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def wait_for_rate_limit(self):
+        if not self.rate_limit:
+            return
+        async with self.rate_lock:
+            now = time.monotonic()
+            delay = self.next_request_at - now
+            self.next_request_at = max(now, self.next_request_at) + 1 / self.rate_limit
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def geocode(self, address):
+        params = {
+            'apikey': self.api_key,
+            'geocode': address,
+            'format': 'json',
+        }
+        for attempt in range(self.max_retries):
+            try:
+                async with self.semaphore:
+                    await self.wait_for_rate_limit()
+                    response = await self.client.get(self.api_url, params=params)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    response.raise_for_status()
+                    return parse_coordinates(response.json())
+                error = GeocoderError(f'{address}: HTTP {response.status_code}')
+            except httpx.TransportError as e:
+                error = GeocoderError(f'{address}: {e!r}')
+            except (httpx.HTTPStatusError, ValueError, KeyError) as e:
+                raise GeocoderError(f'{address}: {e!r}') from e
+
+            logger.warning(f"Ошибка геокодирования (попытка {attempt + 1}): {error}")
+            if attempt < self.max_retries - 1:
+                await asyncio.sleep(self.get_backoff_delay(attempt))
+        raise error
+
+    async def geocode_many(self, addresses):
+        addresses = list(dict.fromkeys(addresses))
+        results = await asyncio.gather(
+            *(self.geocode(address) for address in addresses),
+            return_exceptions=True,
+        )
+        for address, result in zip(addresses, results):
+            if isinstance(result, Exception) and not isinstance(result, GeocoderError):
+                raise result
+        return dict(zip(addresses, results))
+
+
+def geocode_many(api_key, addresses, **geocoder_options):
+    async def run():
+        async with AsyncGeocoder(api_key, **geocoder_options) as geocoder:
+            return await geocoder.geocode_many(addresses)
+
+    if not addresses:
+        return {}
+    return asyncio.run(run())
@@ -0,0 +1,70 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+
+def get_request_fingerprint(data):
+    content = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def replay_response(entry, fingerprint):
+    if entry.fingerprint != fingerprint:
+        return Response(
+            {'error': 'Idempotency-Key уже использован для другого запроса'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    if entry.response_status is None:
+        return Response(
+            {'error': 'Запрос с этим Idempotency-Key ещё обрабатывается'},
+            status=status.HTTP_409_CONFLICT,
+        )
+    return Response(
+        entry.response_body,
+        status=entry.response_status,
+        headers={'Idempotent-Replayed': 'true'},
+    )
+
+
+def claim_idempotency_key(key, data):
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        error = Response(
+            {'error': f'Idempotency-Key длиннее {IDEMPOTENCY_KEY_MAX_LENGTH} символов'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+        return None, error
+
+    fingerprint = get_request_fingerprint(data)
+    IdempotencyKey.objects.expired().filter(key=key).delete()
+    try:
+        with transaction.atomic():
+            entry = IdempotencyKey.objects.create(
+                key=key,
+                fingerprint=fingerprint,
+                expires_at=timezone.now() + settings.IDEMPOTENCY_KEY_TTL,
+            )
+    except IntegrityError:
+        entry = IdempotencyKey.objects.select_for_update().get(key=key)
+        return None, replay_response(entry, fingerprint)
+    return entry, None
+
+
+def save_idempotent_response(entry, response, order=None):
+    if response.status_code >= 500:
+        entry.delete()
+        return
+
+    entry.order = order
+    entry.response_status = response.status_code
+    entry.response_body = response.data
+    entry.save(update_fields=['order', 'response_status', 'response_body'])
@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from foodcartapp.archive import archive_orders_batch
+
+
+class Command(BaseCommand):
+    help = 'Переносит давно завершённые заказы в архив'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.ORDERS_ARCHIVE_AFTER_DAYS,
+            help='архивировать заказы, завершённые больше стольких дней назад',
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=0.1,
+            help='пауза в секундах между пачками',
+        )
+
+    def handle(self, *args, **options):
+        completed_before = timezone.now() - timedelta(days=options['days'])
+
+        archived = 0
+        while True:
+            batch_archived = archive_orders_batch(completed_before, options['batch_size'])
+            if not batch_archived:
+                break
+            archived += batch_archived
+            self.stdout.write(f'Перенесено в архив заказов: {archived}')
+            time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f'Готово, перенесено в архив заказов: {archived}'))
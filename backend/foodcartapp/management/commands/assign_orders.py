@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodcartapp.assignment import assign_unprocessed_orders
+
+
+class Command(BaseCommand):
+    help = 'Назначает необработанным заказам ближайший подходящий ресторан'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10,
+            help='пауза в секундах между проходами',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='сделать один проход и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed, assigned = assign_unprocessed_orders(options['batch_size'])
+            if options['once']:
+                self.stdout.write(f'Назначено ресторанов: {assigned} из {processed} заказов')
+                break
+            time.sleep(options['interval'])
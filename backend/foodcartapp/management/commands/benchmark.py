@@ -0,0 +1,70 @@
+import json
+import platform
+
+from django.core.management.base import BaseCommand
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+from django.utils import timezone
+
+from foodcartapp.benchmarks import generate_data, run_scenarios
+
+
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+class Command(BaseCommand):
+    help = 'Замеряет скорость API и страниц менеджера на сгенерированных данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--restaurants', type=int, default=20)
+        parser.add_argument('--products', type=int, default=100)
+        parser.add_argument('--orders', type=int, default=2000)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark-report.json')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(DEBUG=False, CACHES=BENCHMARK_CACHES):
+                dataset = generate_data(
+                    restaurants=options['restaurants'],
+                    products=options['products'],
+                    orders=options['orders'],
+                    seed=options['seed'],
+                )
+                scenarios = run_scenarios(
+                    iterations=options['iterations'],
+                    seed=options['seed'],
+                )
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'dataset': dataset,
+            'scenarios': scenarios,
+        }
+        with open(options['output'], 'w', encoding='utf-8') as report_file:
+            json.dump(report, report_file, ensure_ascii=False, indent=4)
+
+        for name, result in scenarios.items():
+            self.stdout.write(
+                f"{name}: p50 {result['p50_ms']} мс, p95 {result['p95_ms']} мс, "
+                f"запросов к БД {result['max_queries']}, "
+                f"пик памяти {result['peak_memory_kb']} КБ"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Отчёт сохранён в {options['output']}"))
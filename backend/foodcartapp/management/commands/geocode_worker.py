@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from foodcartapp.utils import process_geocode_jobs
+
+
+class Command(BaseCommand):
+    help = 'Определяет координаты адресов из очереди геокодирования'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='пауза в секундах, когда очередь пуста',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='разобрать очередь и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_geocode_jobs(options['batch_size'])
+            if processed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from foodcartapp.models import Order
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённую стоимость заказов по их позициям'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='только найти заказы с неверной стоимостью, ничего не меняя',
+        )
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            self.verify()
+        else:
+            self.recalculate(options['batch_size'])
+
+    def recalculate(self, batch_size):
+        updated = 0
+        last_id = 0
+        while True:
+            order_ids = list(
+                Order.objects
+                .filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not order_ids:
+                break
+            updated += Order.objects.filter(id__in=order_ids).recalculate_total_price()
+            last_id = order_ids[-1]
+            self.stdout.write(f'Пересчитано заказов: {updated}')
+
+        self.stdout.write(self.style.SUCCESS(f'Готово, пересчитано заказов: {updated}'))
+
+    def verify(self):
+        mismatched = (
+            Order.objects
+            .with_calculated_total_price()
+            .exclude(total_price=F('calculated_total_price'))
+            .order_by('id')
+        )
+        mismatched_count = 0
+        for order in mismatched.iterator():
+            mismatched_count += 1
+            self.stdout.write(
+                f'Заказ {order.id}: сохранено {order.total_price}, '
+                f'по позициям {order.calculated_total_price}'
+            )
+
+        if mismatched_count:
+            self.stdout.write(self.style.ERROR(f'Неверная стоимость у заказов: {mismatched_count}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Стоимость всех заказов верна'))
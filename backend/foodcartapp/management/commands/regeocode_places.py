@@ -0,0 +1,81 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from foodcartapp.models import Place
+from foodcartapp.utils import regeocode_places
+
+
+class Command(BaseCommand):
+    help = 'Определяет координаты адресов без координат или с устаревшими координатами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200)
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            metavar='DAYS',
+            help='также обновить координаты, полученные больше DAYS дней назад',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            help='число одновременных запросов к геокодеру',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            help='не больше стольких запросов к геокодеру в секунду',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='не использовать кэш геокодера',
+        )
+
+    def handle(self, *args, **options):
+        places_filter = Q(lat__isnull=True) | Q(lon__isnull=True)
+        use_cache = not options['no_cache']
+        if options['older_than'] is not None:
+            stale_before = timezone.now() - timedelta(days=options['older_than'])
+            places_filter |= Q(geocoded_at__isnull=True) | Q(geocoded_at__lt=stale_before)
+            use_cache = False
+        places = Place.objects.filter(places_filter).order_by('id')
+
+        total = places.count()
+        self.stdout.write(f'Адресов для геокодирования: {total}')
+
+        processed = 0
+        stats = {'geocoded': 0, 'not_found': 0, 'failed': 0}
+        started_at = time.monotonic()
+        last_id = 0
+        while True:
+            chunk = list(places.filter(id__gt=last_id)[:options['chunk_size']])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+
+            chunk_stats = regeocode_places(
+                chunk,
+                use_cache=use_cache,
+                concurrency=options['concurrency'],
+                rate_limit=options['rate'],
+            )
+            for key in stats:
+                stats[key] += chunk_stats[key]
+            processed += len(chunk)
+
+            elapsed = time.monotonic() - started_at
+            self.stdout.write(
+                f'Обработано {processed} из {total}: '
+                f'найдено {stats["geocoded"]}, не найдено {stats["not_found"]}, '
+                f'ошибок {stats["failed"]}, {processed / elapsed:.1f} адр/с'
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {time.monotonic() - started_at:.1f} с, '
+            f'найдены координаты для {stats["geocoded"]} из {processed} адресов'
+        ))
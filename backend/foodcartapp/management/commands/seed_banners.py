@@ -0,0 +1,39 @@
+import os
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from foodcartapp.models import Banner
+
+
+BANNER_IMAGES_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'banner_images',
+)
+
+DEFAULT_BANNERS = [
+    ('Burger', 'burger.jpg', 'Tasty Burger at your door step'),
+    ('Spices', 'food.jpg', 'All Cuisines'),
+    ('New York', 'tasty.jpg', 'Food is incomplete without a tasty dessert'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Создаёт баннеры по умолчанию, если в базе ещё нет ни одного'
+
+    def handle(self, *args, **options):
+        if Banner.objects.exists():
+            self.stdout.write('Баннеры уже есть, ничего не делаю')
+            return
+
+        banners = []
+        for position, (title, image_name, text) in enumerate(DEFAULT_BANNERS):
+            image = f'banners/{image_name}'
+            if not default_storage.exists(image):
+                with open(os.path.join(BANNER_IMAGES_DIR, image_name), 'rb') as image_file:
+                    image = default_storage.save(image, File(image_file))
+            banners.append(Banner(title=title, image=image, text=text, position=position))
+        Banner.objects.bulk_create(banners)
+
+        self.stdout.write(self.style.SUCCESS(f'Создано баннеров: {len(banners)}'))
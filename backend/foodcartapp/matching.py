@@ -0,0 +1,99 @@
+import numpy as np
+from django.conf import settings
+from geopy.distance import distance
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+HAVERSINE = 'haversine'
+GEODESIC = 'geodesic'
+MATCHING_MODES = (HAVERSINE, GEODESIC)
+
+
+def get_point(place):
+    if place and place.lat and place.lon:
+        return place.lat, place.lon
+    return None
+
+
+def haversine_km(points, targets):
+    points = np.radians(np.asarray(points, dtype=float).reshape(-1, 2))
+    targets = np.radians(np.asarray(targets, dtype=float).reshape(-1, 2))
+
+    lat1 = points[:, 0, np.newaxis]
+    lon1 = points[:, 1, np.newaxis]
+    lat2 = targets[np.newaxis, :, 0]
+    lon2 = targets[np.newaxis, :, 1]
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def geodesic_km(points, targets):
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+
+    result = np.full((len(points), len(targets)), np.nan)
+    for i, point in enumerate(points):
+        if np.isnan(point).any():
+            continue
+        for j, target in enumerate(targets):
+            if np.isnan(target).any():
+                continue
+            result[i, j] = distance(point, target).km
+    return result
+
+
+class RestaurantMatcher:
+    def __init__(self, restaurants, mode=None):
+        self.restaurants = list(restaurants)
+        self.mode = mode or settings.ORDER_MATCHING_MODE
+        if self.mode not in MATCHING_MODES:
+            raise ValueError(f'Неизвестный режим поиска ресторанов: {self.mode}')
+
+        self.positions = {
+            restaurant.id: position
+            for position, restaurant in enumerate(self.restaurants)
+        }
+        self.coords = np.full((len(self.restaurants), 2), np.nan)
+        for position, restaurant in enumerate(self.restaurants):
+            point = get_point(restaurant.location)
+            if point:
+                self.coords[position] = point
+
+    def distances(self, points):
+        coords = np.full((len(points), 2), np.nan)
+        for position, point in enumerate(points):
+            if point:
+                coords[position] = point
+
+        if self.mode == GEODESIC:
+            return geodesic_km(coords, self.coords)
+        return haversine_km(coords, self.coords)
+
+    def match(self, points, eligible=None, max_distance_km=None):
+        distances = self.distances(points)
+        suitable = ~np.isnan(distances)
+        if eligible is not None:
+            suitable &= eligible
+        if max_distance_km is not None:
+            suitable &= np.nan_to_num(distances, nan=np.inf) <= max_distance_km
+
+        candidates = []
+        for row, row_suitable in zip(distances, suitable):
+            positions = np.flatnonzero(row_suitable)
+            positions = positions[np.argsort(row[positions], kind='stable')]
+            candidates.append([
+                (self.restaurants[position], round(float(row[position]), 2))
+                for position in positions
+            ])
+        return distances, candidates
+
+    def distance_to(self, distances, row, restaurant_id):
+        position = self.positions.get(restaurant_id)
+        if position is None or np.isnan(distances[row, position]):
+            return None
+        return round(float(distances[row, position]), 2)
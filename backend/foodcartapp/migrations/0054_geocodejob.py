@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-17 04:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0053_alter_order_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='поставлено в очередь')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='попыток')),
+                ('last_attempt_at', models.DateTimeField(blank=True, null=True, verbose_name='последняя попытка')),
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='geocode_job', to='foodcartapp.place', verbose_name='координаты')),
+            ],
+            options={
+                'verbose_name': 'задача геокодирования',
+                'verbose_name_plural': 'задачи геокодирования',
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-17 04:22
+
+from django.db import migrations, models
+
+
+def normalize_place_addresses(apps, schema_editor):
+    Place = apps.get_model('foodcartapp', 'Place')
+    Order = apps.get_model('foodcartapp', 'Order')
+    Restaurant = apps.get_model('foodcartapp', 'Restaurant')
+    GeocodeJob = apps.get_model('foodcartapp', 'GeocodeJob')
+
+    places = {}
+    for place in Place.objects.order_by('id'):
+        address = ' '.join(place.address.split()).casefold()
+        kept_place = places.setdefault(address, place)
+        if kept_place == place:
+            continue
+
+        if kept_place.lat is None and place.lat is not None:
+            kept_place.lat = place.lat
+            kept_place.lon = place.lon
+            kept_place.save(update_fields=['lat', 'lon'])
+        Order.objects.filter(location=place).update(location=kept_place)
+        Restaurant.objects.filter(location=place).update(location=kept_place)
+        GeocodeJob.objects.filter(place=place).delete()
+        place.delete()
+
+    for address, place in places.items():
+        if place.address != address:
+            place.address = address
+            place.save(update_fields=['address'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0054_geocodejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GeocodeCacheEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('address', models.CharField(max_length=255, unique=True, verbose_name='адрес')),
+                ('lat', models.FloatField(blank=True, null=True, verbose_name='широта')),
+                ('lon', models.FloatField(blank=True, null=True, verbose_name='долгота')),
+                ('expires_at', models.DateTimeField(db_index=True, verbose_name='действует до')),
+            ],
+            options={
+                'verbose_name': 'результат геокодирования',
+                'verbose_name_plural': 'результаты геокодирования',
+            },
+        ),
+        migrations.RunPython(normalize_place_addresses, migrations.RunPython.noop),
+    ]
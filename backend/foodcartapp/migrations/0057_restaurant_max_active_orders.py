@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 04:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0056_order_total_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='max_active_orders',
+            field=models.PositiveIntegerField(blank=True, help_text='Пусто — без ограничений', null=True, verbose_name='максимум заказов в работе'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-17 04:31
+
+import math
+
+from django.db import migrations, models
+
+
+GRID_CELL_SIZE = 0.02
+
+
+def fill_grid_cell(apps, schema_editor):
+    Place = apps.get_model('foodcartapp', 'Place')
+
+    places = list(Place.objects.filter(lat__isnull=False, lon__isnull=False))
+    for place in places:
+        row = math.floor(place.lat / GRID_CELL_SIZE)
+        column = math.floor(place.lon / GRID_CELL_SIZE)
+        place.grid_cell = f'{row}:{column}'
+    Place.objects.bulk_update(places, ['grid_cell'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0057_restaurant_max_active_orders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='grid_cell',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=20, verbose_name='ячейка сетки'),
+        ),
+        migrations.RunPython(fill_grid_cell, migrations.RunPython.noop),
+    ]
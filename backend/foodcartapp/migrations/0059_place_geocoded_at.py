@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 04:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0058_place_grid_cell'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='geocoded_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='дата геокодирования'),
+        ),
+    ]
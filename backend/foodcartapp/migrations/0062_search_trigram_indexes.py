@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+SEARCH_INDEXES = [
+    ('foodcartapp_restaurant_name_trgm', 'foodcartapp_restaurant', 'name'),
+    ('foodcartapp_restaurant_address_trgm', 'foodcartapp_restaurant', 'address'),
+    ('foodcartapp_restaurant_contact_phone_trgm', 'foodcartapp_restaurant', 'contact_phone'),
+    ('foodcartapp_product_name_trgm', 'foodcartapp_product', 'name'),
+    ('foodcartapp_productcategory_name_trgm', 'foodcartapp_productcategory', 'name'),
+    ('foodcartapp_order_address_trgm', 'foodcartapp_order', 'address'),
+    ('foodcartapp_order_phonenumber_trgm', 'foodcartapp_order', 'phonenumber'),
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for name, table, column in SEARCH_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "{table}" USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for name, _, _ in SEARCH_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('foodcartapp', '0061_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-17 04:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0062_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 'completed'), _negated=True), fields=['status', 'id'], name='order_active_status_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['order', 'product'], include=('price', 'quantity'), name='orderitem_order_product_idx'),
+        ),
+    ]
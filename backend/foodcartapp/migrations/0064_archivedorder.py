@@ -0,0 +1,54 @@
+# Generated by Django 4.2 on 2026-10-17 04:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import phonenumber_field.modelfields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0063_order_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False, verbose_name='номер заказа')),
+                ('firstname', models.CharField(max_length=30, verbose_name='Имя')),
+                ('lastname', models.CharField(max_length=30, verbose_name='Фамилия')),
+                ('phonenumber', phonenumber_field.modelfields.PhoneNumberField(db_index=True, max_length=128, region=None, verbose_name='Номер телефона')),
+                ('address', models.CharField(max_length=255, verbose_name='Адрес доставки')),
+                ('status', models.CharField(choices=[('unprocessed', 'Необработанный'), ('confirmed', 'Подтверждённый'), ('assembled', 'Собран'), ('delivering', 'В доставке'), ('completed', 'Завершён')], max_length=20, verbose_name='статус')),
+                ('comment', models.TextField(blank=True, verbose_name='Комментарий')),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Стоимость заказа')),
+                ('created_at', models.DateTimeField(db_index=True, verbose_name='Дата создания')),
+                ('called_at', models.DateTimeField(blank=True, null=True, verbose_name='Время звонка клиенту')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='Время доставки')),
+                ('payment', models.CharField(choices=[('cash', 'Наличностью'), ('card', 'Электронно')], max_length=20, verbose_name='Способ оплаты')),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Дата архивации')),
+                ('location', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to='foodcartapp.place', verbose_name='координаты')),
+                ('restaurant', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_orders', to='foodcartapp.restaurant', verbose_name='Ресторан')),
+            ],
+            options={
+                'verbose_name': 'архивный заказ',
+                'verbose_name_plural': 'архив заказов',
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedOrderItem',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveBigIntegerField(verbose_name='количество')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='цена за единицу')),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='foodcartapp.archivedorder', verbose_name='Заказ')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_items', to='foodcartapp.product', verbose_name='товар')),
+            ],
+            options={
+                'verbose_name': 'позиция архивного заказа',
+                'verbose_name_plural': 'позиции архивного заказа',
+            },
+        ),
+    ]
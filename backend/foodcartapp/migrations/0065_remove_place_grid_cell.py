@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-17 05:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('foodcartapp', '0064_archivedorder'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='place',
+            name='grid_cell',
+        ),
+    ]
@@ -1,19 +1,44 @@
+from datetime import timedelta
+from decimal import Decimal
+
 from django.db import models
-from django.db.models import Sum, F, DecimalField
+from django.db.models import Sum, F, DecimalField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from phonenumber_field.modelfields import PhoneNumberField
 
 
 class OrderQuerySet(models.QuerySet):
-    def with_total_price(self):
+    def with_calculated_total_price(self):
         return self.annotate(
-            total_price=Sum(
-                F('items__price') * F('items__quantity'),
-                output_field=DecimalField()
+            calculated_total_price=Coalesce(
+                Sum(
+                    F('items__price') * F('items__quantity'),
+                    output_field=DecimalField(max_digits=10, decimal_places=2)
+                ),
+                Value(Decimal('0')),
+                output_field=DecimalField(max_digits=10, decimal_places=2)
             )
         )
 
+    def recalculate_total_price(self):
+        items_total_price = (
+            OrderItem.objects
+            .filter(order=OuterRef('pk'))
+            .values('order')
+            .annotate(total_price=Sum(F('price') * F('quantity')))
+            .values('total_price')
+        )
+        return self.update(total_price=Coalesce(
+            Subquery(
+                items_total_price,
+                output_field=DecimalField(max_digits=10, decimal_places=2)
+            ),
+            Value(Decimal('0')),
+            output_field=DecimalField(max_digits=10, decimal_places=2)
+        ))
+
 class Restaurant(models.Model):
     name = models.CharField(
         'название',
@@ -37,6 +62,12 @@ class Restaurant(models.Model):
         verbose_name='координаты',
         related_name='restaurants'
     )
+    max_active_orders = models.PositiveIntegerField(
+        'максимум заказов в работе',
+        blank=True,
+        null=True,
+        help_text='Пусто — без ограничений',
+    )
 
     class Meta:
         verbose_name = 'ресторан'
@@ -171,6 +202,13 @@ class Order(models.Model):
     )
 
     comment = models.TextField('Комментарий', blank=True)
+    total_price = models.DecimalField(
+        'Стоимость заказа',
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        db_index=True,
+    )
     created_at = models.DateTimeField(
         'Дата создания',
         default=timezone.now,
@@ -221,6 +259,13 @@ class Order(models.Model):
     class Meta:
         verbose_name = 'заказ'
         verbose_name_plural = 'заказы'
+        indexes = [
+            models.Index(
+                fields=['status', 'id'],
+                condition=~models.Q(status='completed'),
+                name='order_active_status_id_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if self.restaurant and self.status == 'unprocessed':
@@ -262,6 +307,13 @@ class OrderItem(models.Model):
     class Meta:
         verbose_name='позиция заказа'
         verbose_name_plural = 'позиции заказа'
+        indexes = [
+            models.Index(
+                fields=['order', 'product'],
+                include=['price', 'quantity'],
+                name='orderitem_order_product_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.product.name} x {self.quantity}'
@@ -272,14 +324,242 @@ class OrderItem(models.Model):
         super().save(*args, **kwargs)
 
 
+class ArchivedOrder(models.Model):
+    id = models.IntegerField('номер заказа', primary_key=True)
+    firstname = models.CharField('Имя', max_length=30)
+    lastname = models.CharField('Фамилия', max_length=30)
+    phonenumber = PhoneNumberField('Номер телефона', db_index=True)
+    address = models.CharField('Адрес доставки', max_length=255)
+    status = models.CharField(
+        'статус',
+        max_length=20,
+        choices=Order.STATUS_CHOICES,
+    )
+    comment = models.TextField('Комментарий', blank=True)
+    total_price = models.DecimalField(
+        'Стоимость заказа',
+        max_digits=10,
+        decimal_places=2,
+    )
+    created_at = models.DateTimeField('Дата создания', db_index=True)
+    called_at = models.DateTimeField(
+        'Время звонка клиенту',
+        blank=True,
+        null=True,
+    )
+    delivered_at = models.DateTimeField(
+        'Время доставки',
+        blank=True,
+        null=True,
+    )
+    payment = models.CharField(
+        'Способ оплаты',
+        max_length=20,
+        choices=Order.PAYMENT_CHOICES,
+    )
+    restaurant = models.ForeignKey(
+        Restaurant,
+        verbose_name='Ресторан',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_orders'
+    )
+    location = models.ForeignKey(
+        'Place',
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        verbose_name='координаты',
+        related_name='archived_orders'
+    )
+    archived_at = models.DateTimeField('Дата архивации', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'архивный заказ'
+        verbose_name_plural = 'архив заказов'
+
+    def __str__(self):
+        return f'{self.firstname} {self.lastname} - {self.address}'
+
+
+class ArchivedOrderItem(models.Model):
+    order = models.ForeignKey(
+        ArchivedOrder,
+        on_delete=models.CASCADE,
+        related_name='items',
+        verbose_name='Заказ',
+    )
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='archived_items',
+        verbose_name='товар',
+    )
+    quantity = models.PositiveBigIntegerField('количество')
+    price = models.DecimalField(
+        'цена за единицу',
+        max_digits=8,
+        decimal_places=2,
+    )
+
+    class Meta:
+        verbose_name = 'позиция архивного заказа'
+        verbose_name_plural = 'позиции архивного заказа'
+
+    def __str__(self):
+        return f'{self.product.name} x {self.quantity}'
+
+
+class BannerQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+
+class Banner(models.Model):
+    title = models.CharField('заголовок', max_length=50)
+    image = models.ImageField('картинка', upload_to='banners/')
+    text = models.CharField('текст', max_length=200, blank=True)
+    position = models.PositiveIntegerField(
+        'порядок',
+        default=0,
+        db_index=True,
+    )
+    is_active = models.BooleanField(
+        'показывать',
+        default=True,
+        db_index=True,
+    )
+
+    objects = BannerQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'баннер'
+        verbose_name_plural = 'баннеры'
+        ordering = ['position', 'id']
+
+    def __str__(self):
+        return self.title
+
+
 class Place(models.Model):
     address = models.CharField('адрес', max_length=255, unique=True)
     lat = models.FloatField('широта', blank=True, null=True)
     lon = models.FloatField('долгота', blank=True, null=True)
+    geocoded_at = models.DateTimeField(
+        'дата геокодирования',
+        blank=True,
+        null=True,
+        db_index=True,
+    )
 
     class Meta:
         verbose_name = 'координаты'
         verbose_name_plural = 'координаты'
 
     def __str__(self):
-        return self.address
\ No newline at end of file
+        return self.address
+
+    def set_coordinates(self, lat, lon):
+        self.lat = lat
+        self.lon = lon
+        self.geocoded_at = timezone.now()
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'lat', 'lon'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'geocoded_at'}
+        super().save(*args, **kwargs)
+
+
+class GeocodeCacheEntry(models.Model):
+    address = models.CharField('адрес', max_length=255, unique=True)
+    lat = models.FloatField('широта', blank=True, null=True)
+    lon = models.FloatField('долгота', blank=True, null=True)
+    expires_at = models.DateTimeField('действует до', db_index=True)
+
+    class Meta:
+        verbose_name = 'результат геокодирования'
+        verbose_name_plural = 'результаты геокодирования'
+
+    def __str__(self):
+        return self.address
+
+
+class GeocodeJobQuerySet(models.QuerySet):
+    def pending(self):
+        return self.filter(attempts__lt=GeocodeJob.MAX_ATTEMPTS)
+
+    def ready(self):
+        retry_after = timezone.now() - GeocodeJob.RETRY_DELAY
+        return self.pending().filter(
+            models.Q(last_attempt_at__isnull=True)
+            | models.Q(last_attempt_at__lt=retry_after)
+        )
+
+
+class GeocodeJob(models.Model):
+    MAX_ATTEMPTS = 5
+    RETRY_DELAY = timedelta(minutes=1)
+
+    place = models.OneToOneField(
+        Place,
+        on_delete=models.CASCADE,
+        related_name='geocode_job',
+        verbose_name='координаты',
+    )
+    created_at = models.DateTimeField(
+        'поставлено в очередь',
+        default=timezone.now,
+        db_index=True,
+    )
+    attempts = models.PositiveSmallIntegerField('попыток', default=0)
+    last_attempt_at = models.DateTimeField(
+        'последняя попытка',
+        blank=True,
+        null=True,
+    )
+
+    objects = GeocodeJobQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'задача геокодирования'
+        verbose_name_plural = 'задачи геокодирования'
+
+    def __str__(self):
+        return self.place.address
+
+
+class IdempotencyKeyQuerySet(models.QuerySet):
+    def expired(self):
+        return self.filter(expires_at__lte=timezone.now())
+
+
+class IdempotencyKey(models.Model):
+    key = models.CharField('ключ', max_length=255, unique=True)
+    fingerprint = models.CharField('отпечаток запроса', max_length=64)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.SET_NULL,
+        related_name='idempotency_keys',
+        verbose_name='заказ',
+        blank=True,
+        null=True,
+    )
+    response_status = models.PositiveSmallIntegerField(
+        'статус ответа',
+        blank=True,
+        null=True,
+    )
+    response_body = models.JSONField('тело ответа', blank=True, null=True)
+    created_at = models.DateTimeField('создан', default=timezone.now)
+    expires_at = models.DateTimeField('действует до', db_index=True)
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'ключ идемпотентности'
+        verbose_name_plural = 'ключи идемпотентности'
+
+    def __str__(self):
+        return self.key
@@ -1,24 +1,144 @@
-from rest_framework.serializers import ModelSerializer
+from decimal import Decimal
 
-from foodcartapp.models import Order, OrderItem
+from rest_framework.serializers import (
+    IntegerField,
+    ListSerializer,
+    ModelSerializer,
+    ValidationError,
+)
+
+from foodcartapp.models import Order, OrderItem, Product
+from foodcartapp.utils import (
+    get_or_enqueue_locations,
+    is_deliverable,
+    normalize_address,
+)
+
+
+def calculate_total_price(products_data):
+    return sum(
+        (item['product'].price * item['quantity'] for item in products_data),
+        Decimal('0'),
+    )
+
+
+def collect_product_ids(orders_data):
+    product_id_field = IntegerField(min_value=1)
+    product_ids = set()
+    for order_data in orders_data:
+        products_data = order_data.get('products') if isinstance(order_data, dict) else None
+        if not isinstance(products_data, list):
+            continue
+        for item in products_data:
+            if not isinstance(item, dict) or 'product' not in item:
+                continue
+            try:
+                product_ids.add(product_id_field.run_validation(item['product']))
+            except ValidationError:
+                continue
+    return product_ids
 
 
 class OrderItemSerializer(ModelSerializer):
+    product = IntegerField(min_value=1)
+
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity']
 
 
+class OrderListSerializer(ListSerializer):
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.load_products(collect_product_ids(data))
+        validated_data = super().to_internal_value(data)
+
+        self.locations = get_or_enqueue_locations(
+            order_data['address'] for order_data in validated_data
+        )
+        errors = []
+        for order_data in validated_data:
+            location = self.locations.get(normalize_address(order_data['address']))
+            if location and not is_deliverable(location):
+                errors.append({'address': ['Адрес вне зоны доставки']})
+            else:
+                errors.append({})
+
+        if any(errors):
+            raise ValidationError(errors)
+        return validated_data
+
+    def create(self, validated_data):
+        locations = self.locations
+
+        orders = []
+        orders_products = []
+        for order_data in validated_data:
+            products_data = order_data.pop('products')
+            orders_products.append(products_data)
+            orders.append(Order(
+                **order_data,
+                location=locations.get(normalize_address(order_data['address'])),
+                total_price=calculate_total_price(products_data),
+            ))
+        Order.objects.bulk_create(orders)
+
+        order_items = [
+            OrderItem(
+                order=order,
+                product=item['product'],
+                quantity=item['quantity'],
+                price=item['product'].price
+            )
+            for order, products_data in zip(orders, orders_products)
+            for item in products_data
+        ]
+        OrderItem.objects.bulk_create(order_items)
+        return orders
+
+
 class OrderSerializer(ModelSerializer):
     products = OrderItemSerializer(many=True, allow_empty=False, write_only=True)
 
     class Meta:
         model = Order
         fields = ['firstname', 'lastname', 'address', 'phonenumber', 'products']
+        list_serializer_class = OrderListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.products_by_id = {}
+
+    def load_products(self, product_ids):
+        missing_ids = set(product_ids) - self.products_by_id.keys()
+        if not missing_ids:
+            return
+        found_products = Product.objects.available().in_bulk(missing_ids)
+        for product_id in missing_ids:
+            self.products_by_id[product_id] = found_products.get(product_id)
+
+    def validate_products(self, products_data):
+        self.load_products(item['product'] for item in products_data)
+
+        errors = []
+        for item in products_data:
+            product = self.products_by_id[item['product']]
+            if product is None:
+                errors.append({'product': [f'Товар {item["product"]} не найден или недоступен.']})
+                continue
+            item['product'] = product
+            errors.append({})
+
+        if any(errors):
+            raise ValidationError(errors)
+        return products_data
 
     def create(self, validated_data):
         products_data = validated_data.pop('products')
-        order = Order.objects.create(**validated_data)
+        order = Order.objects.create(
+            **validated_data,
+            total_price=calculate_total_price(products_data),
+        )
 
         order_items = [
             OrderItem(
@@ -31,4 +151,4 @@ class OrderSerializer(ModelSerializer):
         ]
 
         OrderItem.objects.bulk_create(order_items)
-        return order
\ No newline at end of file
+        return order
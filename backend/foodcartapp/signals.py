@@ -0,0 +1,50 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .availability import invalidate_availability_index
+from .banners import invalidate_banners
+from .catalog import invalidate_catalog
+from .models import (
+    Banner,
+    Place,
+    Product,
+    ProductCategory,
+    Restaurant,
+    RestaurantMenuItem,
+)
+from .spatial import invalidate_restaurant_grid
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def reset_availability_index(sender, **kwargs):
+    transaction.on_commit(invalidate_availability_index)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductCategory)
+@receiver([post_save, post_delete], sender=RestaurantMenuItem)
+def reset_catalog(sender, **kwargs):
+    transaction.on_commit(invalidate_catalog)
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def reset_restaurant_grid(sender, **kwargs):
+    transaction.on_commit(invalidate_restaurant_grid)
+
+
+@receiver(post_save, sender=Place)
+def reset_restaurant_grid_on_place_save(sender, instance, created, **kwargs):
+    if not created and instance.restaurants.exists():
+        transaction.on_commit(invalidate_restaurant_grid)
+
+
+@receiver(post_delete, sender=Place)
+def reset_restaurant_grid_on_place_delete(sender, **kwargs):
+    transaction.on_commit(invalidate_restaurant_grid)
+
+
+@receiver([post_save, post_delete], sender=Banner)
+def reset_banners(sender, **kwargs):
+    transaction.on_commit(invalidate_banners)
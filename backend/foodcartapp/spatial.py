@@ -0,0 +1,108 @@
+import math
+from collections import defaultdict
+
+from django.core.cache import cache
+
+
+RESTAURANT_GRID_CACHE_KEY = 'foodcartapp:restaurant_grid'
+RESTAURANT_GRID_CACHE_TTL = 60
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+GRID_CELL_SIZE = 0.02
+
+
+def distance_km(point, other_point):
+    lat1, lon1 = map(math.radians, point)
+    lat2, lon2 = map(math.radians, other_point)
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1)))
+
+
+def get_grid_cell(lat, lon):
+    return math.floor(lat / GRID_CELL_SIZE), math.floor(lon / GRID_CELL_SIZE)
+
+
+def get_cell_size_km(lat):
+    lon_scale = max(math.cos(math.radians(min(abs(lat) + GRID_CELL_SIZE, 90))), 0.01)
+    return GRID_CELL_SIZE * KM_PER_DEGREE, GRID_CELL_SIZE * KM_PER_DEGREE * lon_scale
+
+
+class RestaurantGrid:
+    def __init__(self, restaurants):
+        self.cells = defaultdict(list)
+        for restaurant in restaurants:
+            location = restaurant.location
+            if location and location.lat and location.lon:
+                point = (location.lat, location.lon)
+                self.cells[get_grid_cell(*point)].append((restaurant, point))
+
+        rows = [row for row, _ in self.cells] or [0]
+        columns = [column for _, column in self.cells] or [0]
+        self.bounds = (min(rows), max(rows), min(columns), max(columns))
+
+    def __len__(self):
+        return sum(len(cell) for cell in self.cells.values())
+
+    def iter_ring(self, center, ring):
+        center_row, center_column = center
+        if not ring:
+            yield from self.cells.get(center, ())
+            return
+
+        for column in range(center_column - ring, center_column + ring + 1):
+            yield from self.cells.get((center_row - ring, column), ())
+            yield from self.cells.get((center_row + ring, column), ())
+        for row in range(center_row - ring + 1, center_row + ring):
+            yield from self.cells.get((row, center_column - ring), ())
+            yield from self.cells.get((row, center_column + ring), ())
+
+    def nearest(self, point, k=1, max_distance_km=None):
+        if not self.cells:
+            return []
+
+        center = get_grid_cell(*point)
+        min_row, max_row, min_column, max_column = self.bounds
+        max_ring = max(
+            abs(center[0] - min_row),
+            abs(center[0] - max_row),
+            abs(center[1] - min_column),
+            abs(center[1] - max_column),
+        )
+        ring_step_km = min(get_cell_size_km(point[0]))
+
+        found = []
+        for ring in range(max_ring + 1):
+            for restaurant, restaurant_point in self.iter_ring(center, ring):
+                found.append((restaurant, distance_km(point, restaurant_point)))
+            found.sort(key=lambda found_restaurant: found_restaurant[1])
+
+            next_ring_min_distance = ring * ring_step_km
+            if max_distance_km is not None and next_ring_min_distance > max_distance_km:
+                break
+            if len(found) >= k and found[k - 1][1] <= next_ring_min_distance:
+                break
+
+        return [
+            (restaurant, round(restaurant_distance, 2))
+            for restaurant, restaurant_distance in found[:k]
+            if max_distance_km is None or restaurant_distance <= max_distance_km
+        ]
+
+
+def get_restaurant_grid():
+    from .models import Restaurant
+
+    grid = cache.get(RESTAURANT_GRID_CACHE_KEY)
+    if grid is None:
+        grid = RestaurantGrid(Restaurant.objects.select_related('location'))
+        cache.set(RESTAURANT_GRID_CACHE_KEY, grid, RESTAURANT_GRID_CACHE_TTL)
+    return grid
+
+
+def invalidate_restaurant_grid():
+    cache.delete(RESTAURANT_GRID_CACHE_KEY)
@@ -0,0 +1,670 @@
+import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import Client, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .archive import archive_orders_batch, get_orders_with_archive
+from .geocoder import AsyncGeocoder, GeocoderError, geocode_many
+from .models import (
+    ArchivedOrder,
+    ArchivedOrderItem,
+    GeocodeJob,
+    IdempotencyKey,
+    Order,
+    OrderItem,
+    Place,
+    Product,
+    ProductCategory,
+    Restaurant,
+    RestaurantMenuItem,
+)
+from .spatial import get_restaurant_grid, invalidate_restaurant_grid
+from .utils import (
+    geocode_addresses,
+    geocode_cache_stats,
+    get_or_create_place,
+    get_or_enqueue_location,
+    place_cache,
+    update_place_coordinates,
+)
+
+
+FOUND_RESPONSE = {
+    'response': {'GeoObjectCollection': {'featureMember': [
+        {'GeoObject': {'Point': {'pos': '37.6 55.7'}}},
+    ]}},
+}
+NOT_FOUND_RESPONSE = {
+    'response': {'GeoObjectCollection': {'featureMember': []}},
+}
+
+
+class StubGeocoderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        address = parse_qs(urlparse(self.path).query)['geocode'][0]
+        with server.lock:
+            server.calls[address] += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failures = server.failures.get(address, [])
+            status = failures.pop(0) if failures else 200
+        try:
+            time.sleep(server.delay)
+            if status != 200:
+                self.send_body(status, b'')
+            elif address in server.not_found:
+                self.send_body(200, json.dumps(NOT_FOUND_RESPONSE).encode())
+            else:
+                self.send_body(200, json.dumps(FOUND_RESPONSE).encode())
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_body(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_geocoder(test_case):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubGeocoderHandler)
+    server.lock = threading.Lock()
+    server.calls = Counter()
+    server.failures = {}
+    server.not_found = set()
+    server.delay = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    test_case.addCleanup(server.server_close)
+    test_case.addCleanup(server.shutdown)
+    return server
+
+
+class AsyncGeocoderTest(SimpleTestCase):
+    def setUp(self):
+        self.server = start_stub_geocoder(self)
+        host, port = self.server.server_address
+        self.api_url = f'http://{host}:{port}/1.x'
+
+    def geocode_many(self, addresses, **options):
+        options.setdefault('backoff_base', 0.01)
+        return geocode_many('key', addresses, api_url=self.api_url, **options)
+
+    def test_concurrency_is_bounded(self):
+        self.server.delay = 0.05
+        addresses = [f'Москва, Тверская {number}' for number in range(12)]
+
+        results = self.geocode_many(addresses, concurrency=3)
+
+        self.assertEqual(results, {address: (55.7, 37.6) for address in addresses})
+        self.assertEqual(self.server.max_in_flight, 3)
+
+    def test_retries_server_errors_with_backoff(self):
+        self.server.failures = {'Москва, Тверская 1': [429, 503]}
+
+        with self.assertLogs('foodcartapp.geocoder', 'WARNING') as logs:
+            results = self.geocode_many(['Москва, Тверская 1'], max_retries=3)
+
+        self.assertEqual(results, {'Москва, Тверская 1': (55.7, 37.6)})
+        self.assertEqual(self.server.calls['Москва, Тверская 1'], 3)
+        self.assertEqual(len(logs.records), 2)
+
+    def test_gives_up_after_max_retries(self):
+        self.server.failures = {'Москва, Тверская 1': [503, 503]}
+
+        with self.assertLogs('foodcartapp.geocoder', 'WARNING'):
+            results = self.geocode_many(['Москва, Тверская 1'], max_retries=2)
+
+        self.assertIsInstance(results['Москва, Тверская 1'], GeocoderError)
+        self.assertEqual(self.server.calls['Москва, Тверская 1'], 2)
+
+    def test_empty_feature_member(self):
+        self.server.not_found = {'Нигде'}
+
+        results = self.geocode_many(['Нигде', 'Москва, Тверская 1'])
+
+        self.assertEqual(results, {
+            'Нигде': (None, None),
+            'Москва, Тверская 1': (55.7, 37.6),
+        })
+
+    def test_client_errors_are_not_retried(self):
+        self.server.failures = {'Москва, Тверская 1': [403]}
+
+        results = self.geocode_many(['Москва, Тверская 1'], max_retries=3)
+
+        self.assertIsInstance(results['Москва, Тверская 1'], GeocoderError)
+        self.assertEqual(self.server.calls['Москва, Тверская 1'], 1)
+
+    def test_backoff_delay_is_capped(self):
+        geocoder = AsyncGeocoder('key', backoff_base=1, backoff_max=2)
+
+        delays = [geocoder.get_backoff_delay(attempt) for attempt in range(10)]
+
+        self.assertTrue(all(0 <= delay <= 2 for delay in delays))
+
+
+class GeocodeCacheStatsTest(TestCase):
+    def setUp(self):
+        self.server = start_stub_geocoder(self)
+        host, port = self.server.server_address
+        settings_override = override_settings(GEOCODER_API_URL=f'http://{host}:{port}/1.x')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        place_cache.clear()
+        self.addCleanup(place_cache.clear)
+        stats = geocode_cache_stats.copy()
+        geocode_cache_stats.clear()
+        self.addCleanup(geocode_cache_stats.update, stats)
+        self.addCleanup(geocode_cache_stats.clear)
+
+    def test_queued_address_is_not_a_miss(self):
+        for _ in range(3):
+            get_or_enqueue_location('Москва, Новая улица 1')
+
+        self.assertEqual(geocode_cache_stats['misses'], 0)
+        self.assertEqual(GeocodeJob.objects.count(), 1)
+
+    def test_misses_count_geocoder_requests(self):
+        geocode_addresses(['Москва, Новая улица 1', 'Москва, Новая улица 2'])
+        geocode_addresses(['Москва, Новая улица 1', 'Москва, Новая улица 3'])
+
+        self.assertEqual(sum(self.server.calls.values()), 3)
+        self.assertEqual(geocode_cache_stats['misses'], 3)
+        self.assertEqual(geocode_cache_stats['hits'], 1)
+
+
+class ParallelOrdersTest(TransactionTestCase):
+    threads_count = 8
+
+    def setUp(self):
+        place_cache.clear()
+        self.addCleanup(place_cache.clear)
+        self.product = Product.objects.create(name='Бургер', price=Decimal('100'), image='burger.jpg')
+        RestaurantMenuItem.objects.create(
+            restaurant=Restaurant.objects.create(name='Ресторан'),
+            product=self.product,
+        )
+
+    def post_parallel_orders(self, addresses):
+        barrier = threading.Barrier(len(addresses))
+
+        def post_order(address):
+            try:
+                barrier.wait()
+                return Client().post('/api/order/', {
+                    'firstname': 'Иван',
+                    'lastname': 'Петров',
+                    'phonenumber': '+79291000000',
+                    'address': address,
+                    'products': [{'product': self.product.id, 'quantity': 1}],
+                }, content_type='application/json')
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(len(addresses)) as executor:
+            return list(executor.map(post_order, addresses))
+
+    def assert_one_place_per_address(self):
+        responses = self.post_parallel_orders(
+            ['  Москва,  Новая улица 1 ', 'москва, новая улица 1'] * (self.threads_count // 2)
+        )
+
+        self.assertEqual([response.status_code for response in responses], [201] * self.threads_count)
+        place = Place.objects.get()
+        self.assertEqual(place.address, 'москва, новая улица 1')
+        self.assertEqual(Order.objects.filter(location=place).count(), self.threads_count)
+        self.assertEqual(GeocodeJob.objects.filter(place=place).count(), 1)
+
+    def test_parallel_orders_share_place(self):
+        self.assert_one_place_per_address()
+
+    def test_parallel_orders_share_place_without_returning(self):
+        features = type(connection.features)
+        with mock.patch.object(features, 'can_return_columns_from_insert', False):
+            self.assert_one_place_per_address()
+
+
+class GetOrCreatePlaceTest(TestCase):
+    def setUp(self):
+        place_cache.clear()
+        self.addCleanup(place_cache.clear)
+
+    def test_cached_place_has_fresh_coordinates(self):
+        place = get_or_create_place('Москва, Новая улица 1')
+        Place.objects.filter(pk=place.pk).update(lat=55.75, lon=37.6)
+
+        with self.assertNumQueries(1):
+            cached_place = get_or_create_place('москва,  новая улица 1')
+
+        self.assertEqual(cached_place.pk, place.pk)
+        self.assertEqual((cached_place.lat, cached_place.lon), (55.75, 37.6))
+
+    def test_deleted_place_is_created_again(self):
+        place = get_or_create_place('Москва, Новая улица 1')
+        place.delete()
+
+        new_place = get_or_create_place('Москва, Новая улица 1')
+
+        self.assertNotEqual(new_place.pk, place.pk)
+        self.assertTrue(Place.objects.filter(pk=new_place.pk).exists())
+
+
+class AdminQueriesTest(TestCase):
+    objects_count = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'admin')
+
+        category = ProductCategory.objects.create(name='Бургеры')
+        products = [
+            Product.objects.create(
+                name=f'Бургер {number}',
+                category=category,
+                price=Decimal('100'),
+                image='burger.jpg',
+            )
+            for number in range(cls.objects_count)
+        ]
+        restaurants = [
+            Restaurant.objects.create(name=f'Ресторан {number}', address=f'Москва, Тверская {number}')
+            for number in range(cls.objects_count)
+        ]
+        RestaurantMenuItem.objects.bulk_create([
+            RestaurantMenuItem(restaurant=restaurant, product=product)
+            for restaurant in restaurants
+            for product in products
+        ])
+
+        for number in range(cls.objects_count):
+            order = Order.objects.create(
+                firstname='Иван',
+                lastname='Петров',
+                phonenumber='+79291000000',
+                address=f'Москва, Новая улица {number}',
+                restaurant=restaurants[number],
+            )
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, product=product, quantity=1, price=product.price)
+                for product in products
+            ])
+
+            archived_order = ArchivedOrder.objects.create(
+                id=1000 + number,
+                firstname='Иван',
+                lastname='Петров',
+                phonenumber='+79291000000',
+                address=f'Москва, Старая улица {number}',
+                status='completed',
+                total_price=Decimal('100'),
+                created_at=timezone.now(),
+                payment='cash',
+                restaurant=restaurants[number],
+            )
+            ArchivedOrderItem.objects.bulk_create([
+                ArchivedOrderItem(order=archived_order, product=product, quantity=1, price=product.price)
+                for product in products
+            ])
+
+        cls.order = order
+        cls.restaurant = restaurants[0]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assert_page_queries(self, num, url_name, *args):
+        url = reverse(f'admin:foodcartapp_{url_name}', args=args)
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_order_changelist(self):
+        self.assert_page_queries(4, 'order_changelist')
+
+    def test_orderitem_changelist(self):
+        self.assert_page_queries(4, 'orderitem_changelist')
+
+    def test_product_changelist(self):
+        self.assert_page_queries(6, 'product_changelist')
+
+    def test_archivedorder_changelist(self):
+        self.assert_page_queries(6, 'archivedorder_changelist')
+
+    def test_restaurant_change_form(self):
+        self.assert_page_queries(12, 'restaurant_change', self.restaurant.id)
+
+    def test_order_change_form(self):
+        self.assert_page_queries(11, 'order_change', self.order.id)
+
+
+class RestaurantGridInvalidationTest(TestCase):
+    def setUp(self):
+        invalidate_restaurant_grid()
+        self.addCleanup(invalidate_restaurant_grid)
+        self.place = Place.objects.create(address='москва, тверская 1', lat=55.75, lon=37.6)
+        self.restaurant = Restaurant.objects.create(name='Ресторан', location=self.place)
+
+    def get_nearest_distance(self):
+        [(_, distance)] = get_restaurant_grid().nearest((55.75, 37.6))
+        return distance
+
+    def test_grid_is_reset_after_commit(self):
+        self.assertEqual(self.get_nearest_distance(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place.lat = 55.8
+            self.place.save()
+            self.assertEqual(self.get_nearest_distance(), 0)
+
+        self.assertGreater(self.get_nearest_distance(), 5)
+
+    def test_bulk_coordinates_update_resets_grid(self):
+        self.assertEqual(self.get_nearest_distance(), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place.set_coordinates(55.8, 37.6)
+            update_place_coordinates([self.place])
+
+        self.assertGreater(self.get_nearest_distance(), 5)
+
+
+class MetricsViewTest(TestCase):
+    @override_settings(METRICS_TOKEN='secret', DEBUG=False)
+    def test_token_is_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_forbidden_without_token_outside_debug(self):
+        response = self.client.get('/metrics', REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=True)
+    def test_open_without_token_in_debug(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+
+class RegisterOrderTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Бургер', price=Decimal('100'), image='burger.jpg')
+        cls.unavailable_product = Product.objects.create(
+            name='Салат',
+            price=Decimal('50'),
+            image='salad.jpg',
+        )
+        restaurant = Restaurant.objects.create(name='Ресторан')
+        RestaurantMenuItem.objects.create(restaurant=restaurant, product=cls.product)
+        RestaurantMenuItem.objects.create(
+            restaurant=restaurant,
+            product=cls.unavailable_product,
+            availability=False,
+        )
+
+    def setUp(self):
+        place_cache.clear()
+        self.addCleanup(place_cache.clear)
+
+    def make_order(self, product_id=None, address='Москва, Тверская 1'):
+        return {
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79291000000',
+            'address': address,
+            'products': [{'product': product_id or self.product.id, 'quantity': 2}],
+        }
+
+    def post_order(self, data, idempotency_key=None):
+        headers = {'HTTP_IDEMPOTENCY_KEY': idempotency_key} if idempotency_key else {}
+        return self.client.post('/api/order/', data, content_type='application/json', **headers)
+
+    def test_unavailable_product_is_bad_request(self):
+        response = self.post_order(self.make_order(self.unavailable_product.id))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'products': [{
+            'product': [f'Товар {self.unavailable_product.id} не найден или недоступен.'],
+        }]})
+        self.assertFalse(Order.objects.exists())
+
+    def test_bad_request_is_replayed(self):
+        data = self.make_order(self.unavailable_product.id)
+        first_response = self.post_order(data, idempotency_key='key')
+        replayed_response = self.post_order(data, idempotency_key='key')
+
+        self.assertEqual(replayed_response.status_code, 400)
+        self.assertEqual(replayed_response.json(), first_response.json())
+        self.assertEqual(replayed_response['Idempotent-Replayed'], 'true')
+
+    def test_created_order_is_replayed(self):
+        first_response = self.post_order(self.make_order(), idempotency_key='key')
+        replayed_response = self.post_order(self.make_order(), idempotency_key='key')
+
+        self.assertEqual(first_response.status_code, 201)
+        self.assertFalse(first_response.has_header('Idempotent-Replayed'))
+        self.assertEqual(replayed_response.status_code, 201)
+        self.assertEqual(replayed_response['Idempotent-Replayed'], 'true')
+        self.assertEqual(replayed_response.json(), first_response.json())
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_reused_with_other_body(self):
+        self.post_order(self.make_order(), idempotency_key='key')
+        response = self.post_order(self.make_order(address='Москва, Тверская 2'), idempotency_key='key')
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_expired_key_is_claimed_again(self):
+        self.post_order(self.make_order(), idempotency_key='key')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.post_order(self.make_order(address='Москва, Тверская 2'), idempotency_key='key')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header('Idempotent-Replayed'))
+        self.assertEqual(Order.objects.count(), 2)
+        entry = IdempotencyKey.objects.get()
+        self.assertEqual(entry.order, Order.objects.latest('id'))
+        self.assertGreater(entry.expires_at, timezone.now())
+
+
+class ArchiveOrdersTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.cutoff = cls.now - timedelta(days=30)
+        cls.product = Product.objects.create(name='Бургер', price=Decimal('100'), image='burger.jpg')
+        cls.other_product = Product.objects.create(name='Салат', price=Decimal('50'), image='salad.jpg')
+
+        cls.old_orders = [
+            cls.create_order(status='completed', delivered_at=cls.cutoff - timedelta(days=1)),
+            cls.create_order(status='completed', created_at=cls.cutoff - timedelta(days=2)),
+            cls.create_order(status='completed', delivered_at=cls.cutoff - timedelta(days=3)),
+        ]
+        cls.live_orders = [
+            cls.create_order(status='completed', delivered_at=cls.cutoff + timedelta(days=1)),
+            cls.create_order(status='processing', created_at=cls.cutoff - timedelta(days=5)),
+            cls.create_order(status='unprocessed'),
+        ]
+
+    @classmethod
+    def create_order(cls, **fields):
+        order = Order.objects.create(
+            firstname='Иван',
+            lastname='Петров',
+            phonenumber='+79291000000',
+            address='Москва, Тверская 1',
+            **fields,
+        )
+        OrderItem.objects.create(order=order, product=cls.product, quantity=2, price=Decimal('90'))
+        OrderItem.objects.create(order=order, product=cls.other_product, quantity=1, price=Decimal('50'))
+        Order.objects.filter(pk=order.pk).recalculate_total_price()
+        order.refresh_from_db()
+        return order
+
+    def test_only_orders_completed_before_cutoff_are_archived(self):
+        self.assertEqual(archive_orders_batch(self.cutoff), len(self.old_orders))
+
+        self.assertEqual(
+            list(ArchivedOrder.objects.order_by('id').values_list('id', flat=True)),
+            [order.id for order in self.old_orders],
+        )
+        self.assertEqual(
+            list(Order.objects.order_by('id').values_list('id', flat=True)),
+            [order.id for order in self.live_orders],
+        )
+        self.assertFalse(OrderItem.objects.filter(order_id__in=[order.id for order in self.old_orders]).exists())
+
+    def test_archived_orders_match_originals(self):
+        archive_orders_batch(self.cutoff)
+
+        for order in self.old_orders:
+            archived_order = ArchivedOrder.objects.get(id=order.id)
+            self.assertEqual(archived_order.total_price, Decimal('230'))
+            self.assertEqual(archived_order.total_price, order.total_price)
+            self.assertEqual(archived_order.created_at, order.created_at)
+            self.assertEqual(archived_order.delivered_at, order.delivered_at)
+            self.assertEqual(archived_order.phonenumber, order.phonenumber)
+            self.assertCountEqual(
+                archived_order.items.values_list('product', 'quantity', 'price'),
+                [(self.product.id, 2, Decimal('90')), (self.other_product.id, 1, Decimal('50'))],
+            )
+
+    def test_archiving_in_batches_and_repeating_is_idempotent(self):
+        self.assertEqual(archive_orders_batch(self.cutoff, batch_size=2), 2)
+        self.assertEqual(archive_orders_batch(self.cutoff, batch_size=2), 1)
+        self.assertEqual(archive_orders_batch(self.cutoff, batch_size=2), 0)
+
+        self.assertEqual(ArchivedOrder.objects.count(), len(self.old_orders))
+        self.assertEqual(ArchivedOrderItem.objects.count(), 2 * len(self.old_orders))
+        self.assertEqual(Order.objects.count(), len(self.live_orders))
+
+    def test_orders_with_archive_have_no_duplicates(self):
+        archive_orders_batch(self.cutoff)
+
+        order_ids = [order['id'] for order in get_orders_with_archive('id')]
+
+        self.assertCountEqual(
+            order_ids,
+            [order.id for order in self.old_orders + self.live_orders],
+        )
+
+
+class RegisterOrdersBatchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(name='Бургер', price=Decimal('100'), image='burger.jpg')
+        cls.restaurant = Restaurant.objects.create(
+            name='Ресторан',
+            location=Place.objects.create(address='ресторан', lat=55.75, lon=37.6),
+        )
+        RestaurantMenuItem.objects.create(restaurant=cls.restaurant, product=cls.product)
+        Place.objects.create(address='владивосток, светланская 1', lat=43.1, lon=131.9)
+
+    def setUp(self):
+        place_cache.clear()
+        invalidate_restaurant_grid()
+        self.addCleanup(place_cache.clear)
+        self.addCleanup(invalidate_restaurant_grid)
+
+    def make_order(self, address='Москва, Тверская 1', product_id=None):
+        return {
+            'firstname': 'Иван',
+            'lastname': 'Петров',
+            'phonenumber': '+79291000000',
+            'address': address,
+            'products': [{'product': product_id or self.product.id, 'quantity': 1}],
+        }
+
+    def post_orders(self, orders):
+        return self.client.post('/api/orders/batch/', orders, content_type='application/json')
+
+    def test_errors_are_reported_per_order(self):
+        invalid_order = self.make_order(product_id=999)
+        del invalid_order['firstname']
+
+        response = self.post_orders([self.make_order(), invalid_order])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [{}, {
+            'firstname': ['Обязательное поле.'],
+            'products': [{'product': ['Товар 999 не найден или недоступен.']}],
+        }])
+        self.assertFalse(Order.objects.exists())
+
+    @override_settings(ORDERS_BATCH_MAX_SIZE=2)
+    def test_too_many_orders_are_rejected(self):
+        response = self.post_orders([self.make_order()] * 3)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    @override_settings(DELIVERY_RADIUS_KM=50)
+    def test_out_of_zone_order_rejects_batch_without_side_effects(self):
+        places_count = Place.objects.count()
+
+        response = self.post_orders([
+            self.make_order('Москва, Новая улица 1'),
+            self.make_order('Владивосток, Светланская 1'),
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), [{}, {'address': ['Адрес вне зоны доставки']}])
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Place.objects.count(), places_count)
+        self.assertFalse(GeocodeJob.objects.exists())
+
+    def test_repeated_addresses_share_place_and_job(self):
+        response = self.post_orders([
+            self.make_order('Москва, Новая улица 1'),
+            self.make_order('  москва,  новая улица 1'),
+            self.make_order('Москва, Новая улица 2'),
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 3)
+        new_places = Place.objects.filter(address__startswith='москва, новая улица')
+        self.assertEqual(new_places.count(), 2)
+        self.assertEqual(GeocodeJob.objects.filter(place__in=new_places).count(), 2)
+        self.assertEqual(Order.objects.values('location').distinct().count(), 2)
+
+    def test_query_count_does_not_grow_with_batch(self):
+        def count_queries(orders_count, offset):
+            orders = [
+                self.make_order(f'Москва, Новая улица {offset + number}')
+                for number in range(orders_count)
+            ]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post_orders(orders)
+            self.assertEqual(response.status_code, 201)
+            return len(queries)
+
+        self.assertEqual(count_queries(2, offset=0), count_queries(20, offset=100))
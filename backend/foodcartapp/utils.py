@@ -1,76 +1,301 @@
+from collections import Counter, OrderedDict
 from django.conf import settings
 import logging
-import requests
-from django.db import transaction
+import threading
+from django.db import IntegrityError, connections, models, router, transaction
+from django.utils import timezone
 
-from geopy.geocoders import Yandex
+from star_burger.metrics import track_external_call
 
-from .models import Place
+from .geocoder import GeocoderError, geocode_many
+from .models import GeocodeCacheEntry, GeocodeJob, Place, Restaurant
+from .spatial import get_restaurant_grid, invalidate_restaurant_grid
 
 
-geolocator = Yandex(api_key=settings.YANDEX_GEOCODER_API_KEY, timeout=10)
 GEOCODER_API_KEY = settings.YANDEX_GEOCODER_API_KEY
-GEOCODER_API_URL = 'https://geocode-maps.yandex.ru/1.x'
 
 logger = logging.getLogger(__name__)
 
+geocode_cache_stats = Counter()
 
-def fetch_coordinates(api_key, address, max_retries=3):
-    url = 'https://geocode-maps.yandex.ru/1.x'
-    params = {
-        'apikey': api_key,
-        'geocode': address,
-        'format': 'json'
-    }
-    
-    for attempt in range(max_retries):
+class PlaceCache:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.places = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, address):
+        with self.lock:
+            place = self.places.get(address)
+            if place is not None:
+                self.places.move_to_end(address)
+            return place
+
+    def set(self, address, place):
+        with self.lock:
+            self.places[address] = place
+            self.places.move_to_end(address)
+            while len(self.places) > self.maxsize:
+                self.places.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.places.clear()
+
+
+place_cache = PlaceCache(settings.PLACE_CACHE_SIZE)
+
+
+def normalize_address(address):
+    return ' '.join(address.split()).casefold()
+
+
+def get_cached_geocode(address):
+    entry = (
+        GeocodeCacheEntry.objects
+        .filter(address=normalize_address(address), expires_at__gt=timezone.now())
+        .first()
+    )
+    if entry is None:
+        return None
+    geocode_cache_stats['negative_hits' if entry.lat is None else 'hits'] += 1
+    return entry
+
+
+def get_cache_ttl(lat):
+    if lat is None:
+        return settings.GEOCODER_NEGATIVE_CACHE_TTL
+    return settings.GEOCODER_CACHE_TTL
+
+
+def geocode_addresses(addresses, use_cache=True, concurrency=None, rate_limit=None):
+    addresses = {normalize_address(address) for address in addresses if address}
+    results = {}
+    if use_cache:
+        entries = GeocodeCacheEntry.objects.filter(
+            address__in=addresses,
+            expires_at__gt=timezone.now(),
+        )
+        results = {entry.address: (entry.lat, entry.lon) for entry in entries}
+        for lat, _ in results.values():
+            geocode_cache_stats['negative_hits' if lat is None else 'hits'] += 1
+
+    missing_addresses = sorted(addresses - results.keys())
+    geocode_cache_stats['misses'] += len(missing_addresses)
+    with track_external_call():
+        fetched = geocode_many(
+            GEOCODER_API_KEY,
+            missing_addresses,
+            api_url=settings.GEOCODER_API_URL,
+            concurrency=concurrency or settings.GEOCODER_CONCURRENCY,
+            rate_limit=rate_limit or settings.GEOCODER_RATE_LIMIT,
+        )
+
+    now = timezone.now()
+    new_entries = []
+    for address, result in fetched.items():
+        results[address] = result
+        if isinstance(result, GeocoderError):
+            continue
+        lat, lon = result
+        new_entries.append(GeocodeCacheEntry(
+            address=address,
+            lat=lat,
+            lon=lon,
+            expires_at=now + get_cache_ttl(lat),
+        ))
+    GeocodeCacheEntry.objects.bulk_create(
+        new_entries,
+        update_conflicts=True,
+        unique_fields=['address'],
+        update_fields=['lat', 'lon', 'expires_at'],
+    )
+    return results
+
+
+def insert_place(address):
+    connection = connections[router.db_for_write(Place)]
+    if connection.vendor not in ('postgresql', 'sqlite') or not connection.features.can_return_columns_from_insert:
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            geo_data = response.json()
-            features = geo_data.get("response", {}).get("GeoObjectCollection", {}).get("featureMember", [])
-            
-            if not features:
-                logger.debug(f"Не найдены координаты для адреса: {address}")
-                return None, None
-                
-            coords = features[0]["GeoObject"]["Point"]["pos"]
-            lon, lat = map(float, coords.split(' '))
-            return lat, lon
-            
-        except requests.Timeout:
-            if attempt == max_retries - 1:
-                logger.warning(f"Таймаут геокодирования для адреса: {address}")
-                return None, None
-        except Exception as e:
-            logger.error(f"Ошибка геокодирования (попытка {attempt + 1}): {str(e)}")
-            if attempt == max_retries - 1:
-                return None, None
-
-
-def create_or_update_location(address, obj=None):
+            with transaction.atomic(using=connection.alias):
+                return Place.objects.using(connection.alias).get_or_create(address=address)[0]
+        except IntegrityError:
+            return Place.objects.using(connection.alias).get(address=address)
+
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {quote_name(Place._meta.db_table)} '
+            f'({quote_name("address")}) VALUES (%s) '
+            f'ON CONFLICT ({quote_name("address")}) DO NOTHING '
+            f'RETURNING {quote_name("id")}',
+            [address],
+        )
+        row = cursor.fetchone()
+    if row:
+        return Place(id=row[0], address=address)
+    return Place.objects.using(connection.alias).get(address=address)
+
+
+def get_or_create_place(address):
+    address = normalize_address(address)
+    place_id = place_cache.get(address)
+    if place_id is not None:
+        place = Place.objects.using(router.db_for_write(Place)).filter(pk=place_id).first()
+        if place is not None:
+            return place
+
+    place = insert_place(address)
+    place_cache.set(address, place.id)
+    return place
+
+
+def get_or_enqueue_location(address):
     if not address:
         logger.error("Передан пустой адрес")
         return None
-    
-    try:
-        with transaction.atomic():
-            place, created = Place.objects.get_or_create(address=address)
-            
-            if created or not (place.lat and place.lon):
-                lat, lon = fetch_coordinates(settings.YANDEX_GEOCODER_API_KEY, address)
-                if lat and lon:
-                    place.lat = lat
-                    place.lon = lon
-                    place.save(update_fields=['lat', 'lon'])
-            
-            if obj and hasattr(obj, 'location'):
-                obj.location = place
-                obj.save(update_fields=['location'])
-            
-            return place
-            
-    except Exception as e:
-        logger.error(f"Ошибка при обработке локации для {address}: {str(e)}")
-        return None
\ No newline at end of file
+
+    place = get_or_create_place(address)
+    if place.lat is not None and place.lon is not None:
+        return place
+
+    entry = get_cached_geocode(place.address)
+    if entry is None:
+        GeocodeJob.objects.get_or_create(place=place)
+    elif entry.lat is not None:
+        place.set_coordinates(entry.lat, entry.lon)
+        place.save(update_fields=['lat', 'lon'])
+    return place
+
+
+def update_place_coordinates(places):
+    if not places:
+        return
+    Place.objects.bulk_update(places, ['lat', 'lon', 'geocoded_at'])
+    if Restaurant.objects.filter(location__in=places).exists():
+        transaction.on_commit(invalidate_restaurant_grid)
+
+
+def get_or_enqueue_locations(addresses):
+    addresses = {normalize_address(address) for address in addresses if address}
+    places = {
+        place.address: place
+        for place in Place.objects.filter(address__in=addresses)
+    }
+    new_addresses = addresses - places.keys()
+    if new_addresses:
+        Place.objects.bulk_create(
+            [Place(address=address) for address in new_addresses],
+            ignore_conflicts=True,
+        )
+        places.update({
+            place.address: place
+            for place in Place.objects.filter(address__in=new_addresses)
+        })
+
+    ungeocoded_places = [
+        place for place in places.values()
+        if place.lat is None or place.lon is None
+    ]
+    cache_entries = {
+        entry.address: entry
+        for entry in GeocodeCacheEntry.objects.filter(
+            address__in=[place.address for place in ungeocoded_places],
+            expires_at__gt=timezone.now(),
+        )
+    }
+
+    geocoded_places = []
+    new_jobs = []
+    for place in ungeocoded_places:
+        entry = cache_entries.get(place.address)
+        if entry is None:
+            new_jobs.append(GeocodeJob(place=place))
+        elif entry.lat is None:
+            geocode_cache_stats['negative_hits'] += 1
+        else:
+            geocode_cache_stats['hits'] += 1
+            place.set_coordinates(entry.lat, entry.lon)
+            geocoded_places.append(place)
+
+    update_place_coordinates(geocoded_places)
+    GeocodeJob.objects.bulk_create(new_jobs, ignore_conflicts=True)
+    return places
+
+
+def is_deliverable(place):
+    radius_km = settings.DELIVERY_RADIUS_KM
+    if radius_km is None or place.lat is None or place.lon is None:
+        return True
+
+    grid = get_restaurant_grid()
+    if not len(grid):
+        return True
+    return bool(grid.nearest((place.lat, place.lon), max_distance_km=radius_km))
+
+
+def regeocode_places(places, use_cache=True, concurrency=None, rate_limit=None):
+    results = geocode_addresses(
+        (place.address for place in places),
+        use_cache=use_cache,
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+    )
+
+    stats = Counter()
+    geocoded_places = []
+    for place in places:
+        result = results.get(normalize_address(place.address))
+        if result is None or isinstance(result, GeocoderError):
+            stats['failed'] += 1
+            continue
+        lat, lon = result
+        if lat is None or lon is None:
+            stats['not_found'] += 1
+            continue
+        place.set_coordinates(lat, lon)
+        geocoded_places.append(place)
+        stats['geocoded'] += 1
+
+    update_place_coordinates(geocoded_places)
+    GeocodeJob.objects.filter(place__in=geocoded_places).delete()
+    return stats
+
+
+def process_geocode_jobs(batch_size=50):
+    with transaction.atomic():
+        jobs = list(
+            GeocodeJob.objects
+            .ready()
+            .select_related('place')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('attempts', 'created_at')[:batch_size]
+        )
+        if not jobs:
+            return 0
+
+        GeocodeJob.objects.filter(pk__in=[job.pk for job in jobs]).update(
+            attempts=models.F('attempts') + 1,
+            last_attempt_at=timezone.now(),
+        )
+
+    results = geocode_addresses(job.place.address for job in jobs)
+
+    done_jobs = []
+    geocoded_places = []
+    for job in jobs:
+        place = job.place
+        result = results.get(normalize_address(place.address))
+        if result is None or isinstance(result, GeocoderError):
+            continue
+        done_jobs.append(job.pk)
+        lat, lon = result
+        if lat is None or lon is None:
+            continue
+        place.set_coordinates(lat, lon)
+        geocoded_places.append(place)
+
+    update_place_coordinates(geocoded_places)
+    GeocodeJob.objects.filter(pk__in=done_jobs).delete()
+    logger.info(f"Геокодировано адресов: {len(geocoded_places)} из {len(jobs)}")
+    return len(jobs)
@@ -1,101 +1,117 @@
-from django.http import JsonResponse
-from django.templatetags.static import static
+import json
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.db import transaction
+from django.utils.http import parse_etags
 from .serializers import OrderSerializer
 import logging
 
 
-from .models import Product, Order, OrderItem
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
 
-from .utils import create_or_update_location
+from .banners import get_banners
+from .catalog import get_catalog
+from .idempotency import claim_idempotency_key, save_idempotent_response
+from .renderers import dumps, is_pretty_requested
+from .utils import get_or_enqueue_location, is_deliverable
 
 logger = logging.getLogger(__name__)
 
 def banners_list_api(request):
-    # FIXME move data to db?
-    return JsonResponse([
-        {
-            'title': 'Burger',
-            'src': static('burger.jpg'),
-            'text': 'Tasty Burger at your door step',
-        },
-        {
-            'title': 'Spices',
-            'src': static('food.jpg'),
-            'text': 'All Cuisines',
-        },
-        {
-            'title': 'New York',
-            'src': static('tasty.jpg'),
-            'text': 'Food is incomplete without a tasty dessert',
-        }
-    ], safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    content = get_banners()
+    if is_pretty_requested(request):
+        content = dumps(json.loads(content), pretty=True)
+    return HttpResponse(content, content_type='application/json')
 
 
 def product_list_api(request):
-    products = Product.objects.select_related('category').available()
-
-    dumped_products = []
-    for product in products:
-        dumped_product = {
-            'id': product.id,
-            'name': product.name,
-            'price': product.price,
-            'special_status': product.special_status,
-            'description': product.description,
-            'category': {
-                'id': product.category.id,
-                'name': product.category.name,
-            } if product.category else None,
-            'image': product.image.url,
-            'restaurant': {
-                'id': product.id,
-                'name': product.name,
-            }
-        }
-        dumped_products.append(dumped_product)
-    return JsonResponse(dumped_products, safe=False, json_dumps_params={
-        'ensure_ascii': False,
-        'indent': 4,
-    })
+    content, etag = get_catalog()
 
-@transaction.atomic
-@api_view(['POST'])
-def register_order(request):
-    try:
-        serializer = OrderSerializer(data=request.data)
-        serializer.is_valid(raise_exception=True)
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    elif is_pretty_requested(request):
+        response = HttpResponse(dumps(json.loads(content), pretty=True), content_type='application/json')
+    else:
+        response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    return response
 
-        address = request.data.get('address')
-        if not address:
-            return Response(
-                {'error': 'Address is required'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+def create_order(request):
+    try:
+        with transaction.atomic():
+            serializer = OrderSerializer(data=request.data)
+            if not serializer.is_valid():
+                return Response(
+                    serializer.errors,
+                    status=status.HTTP_400_BAD_REQUEST
+                ), None
 
-        order = serializer.save()
+            address = request.data.get('address')
+            if not address:
+                return Response(
+                    {'error': 'Address is required'},
+                    status=status.HTTP_400_BAD_REQUEST
+                ), None
 
-        location = create_or_update_location(address)
-        if not location:
-            logger.error(f"Failed to create location for order {order.id}")
+            location = get_or_enqueue_location(address)
+            if location and not is_deliverable(location):
+                return Response(
+                    {'address': ['Адрес вне зоны доставки']},
+                    status=status.HTTP_400_BAD_REQUEST
+                ), None
 
-        order.location = location
-        order.save(update_fields=['location'])
+            order = serializer.save(location=location)
+            if not location:
+                logger.error(f"Failed to create location for order {order.id}")
 
-        return Response(
-            OrderSerializer(order).data,
-            status=status.HTTP_201_CREATED
-        )
+            return Response(
+                OrderSerializer(order).data,
+                status=status.HTTP_201_CREATED
+            ), order
 
     except Exception as e:
         logger.error(f"Error creating order: {str(e)}")
         return Response(
             {'error': str(e)},
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+        ), None
+
+
+@transaction.atomic
+@api_view(['POST'])
+def register_order(request):
+    idempotency_key = request.headers.get('Idempotency-Key')
+    if not idempotency_key:
+        response, _ = create_order(request)
+        return response
+
+    entry, replay = claim_idempotency_key(idempotency_key, request.data)
+    if replay:
+        return replay
+
+    response, order = create_order(request)
+    save_idempotent_response(entry, response, order)
+    return response
+
+
+@transaction.atomic
+@api_view(['POST'])
+def register_orders_batch(request):
+    serializer = OrderSerializer(
+        data=request.data,
+        many=True,
+        max_length=settings.ORDERS_BATCH_MAX_SIZE,
+    )
+    if not serializer.is_valid():
+        transaction.set_rollback(True)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    orders = serializer.save()
+    return Response(
+        [{'id': order.id, **OrderSerializer(order).data} for order in orders],
+        status=status.HTTP_201_CREATED
+    )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from foodcartapp.models import OrderItem
+from restaurateur.views import ORDERS_PAGE_SIZE, get_dashboard_orders
+
+
+class Command(BaseCommand):
+    help = 'Показывает планы запросов страницы заказов и проверяет, что они используют индексы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--no-analyze',
+            action='store_true',
+            help='не выполнять запросы, только построить планы (EXPLAIN без ANALYZE)',
+        )
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if connection.vendor == 'postgresql' and not options['no_analyze']:
+            explain_options = {'analyze': True, 'buffers': True}
+
+        orders = get_dashboard_orders({})[:ORDERS_PAGE_SIZE + 1]
+        order_ids = list(orders.values_list('id', flat=True))
+        queries = [
+            (
+                'Страница заказов',
+                orders.prefetch_related(None),
+                'order_active_status_id_idx',
+            ),
+            (
+                'Позиции заказов на странице',
+                OrderItem.objects.filter(order_id__in=order_ids or [0]).values_list(
+                    'order_id', 'product_id', 'price', 'quantity'
+                ),
+                'orderitem_order_product_idx',
+            ),
+        ]
+
+        unused_indexes = 0
+        for title, queryset, index_name in queries:
+            plan = queryset.explain(**explain_options)
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(plan)
+            if index_name in plan:
+                self.stdout.write(self.style.SUCCESS(f'Индекс {index_name} используется\n'))
+            else:
+                unused_indexes += 1
+                self.stdout.write(self.style.WARNING(f'Индекс {index_name} не используется\n'))
+
+        if unused_indexes:
+            self.stdout.write(self.style.WARNING(
+                'Часть индексов не используется. На маленькой базе планировщику '
+                'выгоднее читать таблицу целиком, проверяйте на данных с продакшена.'
+            ))
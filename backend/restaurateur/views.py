@@ -1,22 +1,32 @@
-from collections import defaultdict
+import csv
 import logging
-
-from geopy.distance import distance
+import uuid
 
 from django import forms
 from django.conf import settings
 from django.contrib.auth import authenticate, login
 from django.contrib.auth import views as auth_views
 from django.contrib.auth.decorators import user_passes_test
+from django.core.paginator import Paginator
+from django.db.models import Exists, OuterRef, Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import redirect, render
+from django.template.loader import get_template, render_to_string
 from django.urls import reverse_lazy
 from django.views import View
 
-from foodcartapp.models import Order, Product, Restaurant, RestaurantMenuItem
+from foodcartapp.availability import get_availability_index
+from foodcartapp.matching import MATCHING_MODES, RestaurantMatcher, get_point
+from foodcartapp.models import GeocodeJob, Order, Product, Restaurant
+from star_burger.db_router import read_from_replica
 
 
 logger = logging.getLogger(__name__)
 
+ORDERS_PAGE_SIZE = 50
+PRODUCTS_PAGE_SIZE = 100
+PRODUCTS_CSV_CHUNK_SIZE = 1000
+
 
 class Login(forms.Form):
     username = forms.CharField(
@@ -70,114 +80,200 @@ def is_manager(user):
     return user.is_staff  # FIXME replace with specific permission
 
 
+class Echo:
+    def write(self, value):
+        return value
+
+
+def export_products_csv(restaurants):
+    index = get_availability_index()
+    restaurant_ids = [restaurant.id for restaurant in restaurants]
+    products = (
+        Product.objects
+        .order_by('id')
+        .values_list('id', 'name', 'category__name', 'price')
+    )
+
+    def get_rows():
+        yield ['id', 'Название', 'Категория', 'Цена', *(restaurant.name for restaurant in restaurants)]
+        last_id = 0
+        while True:
+            chunk = list(products.filter(id__gt=last_id)[:PRODUCTS_CSV_CHUNK_SIZE])
+            if not chunk:
+                break
+            last_id = chunk[-1][0]
+            availability = index.eligible_matrix(
+                [[product_id] for product_id, *_ in chunk],
+                restaurant_ids,
+            )
+            for product, available in zip(chunk, availability.astype(int).tolist()):
+                yield [*product, *available]
+
+    writer = csv.writer(Echo())
+    response = StreamingHttpResponse(
+        (writer.writerow(row) for row in get_rows()),
+        content_type='text/csv; charset=utf-8',
+    )
+    response['Content-Disposition'] = 'attachment; filename="products.csv"'
+    return response
+
+
 @user_passes_test(is_manager, login_url='restaurateur:login')
+@read_from_replica
 def view_products(request):
     restaurants = list(Restaurant.objects.order_by('name'))
-    products = list(Product.objects.prefetch_related('menu_items'))
-
-    products_with_restaurant_availability = []
-    for product in products:
-        availability = {
-            item.restaurant_id: item.availability for item in product.menu_items.all()
-        }
-        ordered_availability = [
-            availability.get(restaurant.id, False) for restaurant in restaurants
-        ]
+    if request.GET.get('format') == 'csv':
+        return export_products_csv(restaurants)
 
-        products_with_restaurant_availability.append(
-            (product, ordered_availability)
-        )
+    products = Product.objects.select_related('category').order_by('id')
+    page = Paginator(products, PRODUCTS_PAGE_SIZE).get_page(request.GET.get('page'))
+
+    availability = get_availability_index().eligible_matrix(
+        [[product.id] for product in page],
+        [restaurant.id for restaurant in restaurants],
+    )
+    products_with_restaurant_availability = list(zip(page, availability.tolist()))
 
     return render(request, template_name="products_list.html", context={
         'products_with_restaurant_availability': products_with_restaurant_availability,
         'restaurants': restaurants,
+        'page': page,
     })
 
 
 @user_passes_test(is_manager, login_url='restaurateur:login')
+@read_from_replica
 def view_restaurants(request):
     return render(request, template_name="restaurants_list.html", context={
         'restaurants': Restaurant.objects.all(),
     })
 
 
-@user_passes_test(is_manager, login_url="restaurateur:login")
-def view_orders(request):
+class OrdersFilterForm(forms.Form):
+    status = forms.ChoiceField(
+        label='Статус',
+        required=False,
+        choices=[('', 'Все, кроме завершённых'), *Order.STATUS_CHOICES],
+    )
+    payment = forms.ChoiceField(
+        label='Оплата',
+        required=False,
+        choices=[('', 'Любая'), *Order.PAYMENT_CHOICES],
+    )
+    restaurant = forms.TypedChoiceField(
+        label='Ресторан',
+        required=False,
+        coerce=int,
+        empty_value=None,
+    )
+
+    def __init__(self, *args, restaurants=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['restaurant'].choices = [
+            ('', 'Любой'),
+            *((restaurant.id, restaurant.name) for restaurant in restaurants),
+        ]
+
+
+def parse_orders_cursor(cursor):
+    status, _, order_id = (cursor or '').partition(':')
+    if not status or not order_id.isdigit():
+        return None
+    return status, int(order_id)
+
+
+def get_dashboard_orders(filters, cursor=None):
     orders = (
         Order.objects
-        .with_total_price()
-        .exclude(status='completed')
-        .prefetch_related('items__product')
+        .prefetch_related('items')
         .select_related('restaurant', 'location')
+        .annotate(geocode_pending=Exists(
+            GeocodeJob.objects.pending().filter(place=OuterRef('location'))
+        ))
         .order_by('-status', '-id')
     )
+    if filters.get('status'):
+        orders = orders.filter(status=filters['status'])
+    else:
+        orders = orders.exclude(status='completed')
+    if filters.get('payment'):
+        orders = orders.filter(payment=filters['payment'])
+    if filters.get('restaurant'):
+        orders = orders.filter(restaurant_id=filters['restaurant'])
+
+    if cursor:
+        status, order_id = cursor
+        orders = orders.filter(
+            Q(status__lt=status) | Q(status=status, id__lt=order_id)
+        )
+    return orders
+
 
-    restaurants = list(Restaurant.objects.select_related('location'))
-    menu_items = RestaurantMenuItem.objects.filter(
-        availability=True
-    ).select_related("restaurant", "product")
-
-    available_in = defaultdict(set)
-    for item in menu_items:
-        available_in[item.product_id].add(item.restaurant_id)
-
-    restaurants_to_update = []
-    restaurant_coords = {}
-
-    for restaurant in restaurants:
-        if restaurant.location.lat and restaurant.location.lon:
-            restaurant_coords[restaurant.id] = (restaurant.location.lat, restaurant.location.lon)
-        else:
-            restaurant_coords[restaurant.id] = (None, None)
-
-    if restaurants_to_update:
-        Restaurant.objects.bulk_update(restaurants_to_update, ['location'])
-
-    orders_to_update = []
-    order_coords = {}
-
-    for order in orders:
-            if order.location.lat and order.location.lon:
-                order_coords[order.id] = (order.location.lat, order.location.lon)
-            else:
-                order_coords[order.id] = (None, None)
-
-    if orders_to_update:
-        Order.objects.bulk_update(orders_to_update, ['location'])
-
-    order_infos = []
-
-    for order in orders:
-        products = [item.product for item in order.items.all()]
-        order_point = order_coords.get(order.id)
-        geocode_error = order_point is None
-
-        suitable_restaurants = []
-        if order_point:
-            for restaurant in restaurants:
-                if all(restaurant.id in available_in[product.id] for product in products):
-                    rest_point = restaurant_coords.get(restaurant.id)
-                    if rest_point:
-                        dist = distance(order_point, rest_point).km
-                        suitable_restaurants.append((restaurant, round(dist, 2)))
-            suitable_restaurants.sort(key=lambda r: r[1])
-
-        assigned_info = None
-        if order.restaurant:
-            rest_point = restaurant_coords.get(order.restaurant.id)
-            if order_point and rest_point:
+@user_passes_test(is_manager, login_url="restaurateur:login")
+@read_from_replica
+def view_orders(request):
+    restaurants = list(Restaurant.objects.select_related('location').order_by('name'))
+    filter_form = OrdersFilterForm(request.GET, restaurants=restaurants)
+    filter_form.is_valid()
+    filters = filter_form.cleaned_data
+
+    orders = get_dashboard_orders(filters, parse_orders_cursor(request.GET.get('after')))
+    orders = list(orders[:ORDERS_PAGE_SIZE + 1])
+    next_page_url = None
+    if len(orders) > ORDERS_PAGE_SIZE:
+        orders = orders[:ORDERS_PAGE_SIZE]
+        last_order = orders[-1]
+        query = request.GET.copy()
+        query['after'] = f'{last_order.status}:{last_order.id}'
+        next_page_url = f'?{query.urlencode()}'
+
+    eligible = get_availability_index().eligible_matrix(
+        [[item.product_id for item in order.items.all()] for order in orders],
+        [restaurant.id for restaurant in restaurants],
+    )
+
+    mode = request.GET.get('matching')
+    matcher = RestaurantMatcher(restaurants, mode if mode in MATCHING_MODES else None)
+    order_points = [get_point(order.location) for order in orders]
+    distances, candidates = matcher.match(
+        order_points,
+        eligible,
+        max_distance_km=settings.DELIVERY_RADIUS_KM,
+    )
+
+    def get_order_infos():
+        for row, (order, order_point) in enumerate(zip(orders, order_points)):
+            geocode_pending = order_point is None and order.geocode_pending
+            geocode_error = order_point is None and not geocode_pending
+
+            assigned_info = None
+            if order.restaurant:
                 assigned_info = (
                     order.restaurant,
-                    round(distance(order_point, rest_point).km, 2)
+                    matcher.distance_to(distances, row, order.restaurant_id),
                 )
-            else:
-                assigned_info = (order.restaurant, None)
-
-        order_infos.append({
-            "order": order,
-            "available_restaurants": suitable_restaurants,
-            "assigned_restaurant_info": assigned_info,
-            "geocode_error": geocode_error,
-        })
 
-    return render(request, "order_items.html", {"order_infos": order_infos})
\ No newline at end of file
+            yield {
+                "order": order,
+                "available_restaurants": candidates[row],
+                "assigned_restaurant_info": assigned_info,
+                "geocode_error": geocode_error,
+                "geocode_pending": geocode_pending,
+            }
+
+    rows_placeholder = uuid.uuid4().hex
+    page = render_to_string("order_items.html", {
+        "filter_form": filter_form,
+        "next_page_url": next_page_url,
+        "rows_placeholder": rows_placeholder,
+    }, request)
+    page_head, page_tail = page.split(rows_placeholder)
+    row_template = get_template("order_item_row.html")
+
+    def render_page():
+        yield page_head
+        for info in get_order_infos():
+            yield row_template.render({"info": info}, request)
+        yield page_tail
+
+    return StreamingHttpResponse(render_page())
@@ -0,0 +1,103 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+
+
+REPLICA_DATABASE = 'replica'
+PRIMARY_PIN_COOKIE = 'primary_pin'
+
+current_routing = ContextVar('current_routing', default=None)
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.use_replica = False
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        if state is None or state.pinned or not state.use_replica:
+            return None
+        if REPLICA_DATABASE not in settings.DATABASES:
+            return None
+        return REPLICA_DATABASE
+
+    def db_for_write(self, model, **hints):
+        state = current_routing.get()
+        if state is not None:
+            state.pinned = True
+            state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+
+def read_from_replica(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        state = current_routing.get()
+        if state is None:
+            return view(request, *args, **kwargs)
+
+        state.use_replica = True
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            state.use_replica = False
+            raise
+
+        if response.streaming:
+            response.streaming_content = stream_from_replica(state, response.streaming_content)
+        else:
+            state.use_replica = False
+        return response
+
+    return wrapper
+
+
+def stream_from_replica(state, content):
+    try:
+        yield from content
+    finally:
+        state.use_replica = False
+
+
+@contextmanager
+def read_from_primary():
+    state = current_routing.get()
+    if state is None:
+        yield
+        return
+
+    use_replica = state.use_replica
+    state.use_replica = False
+    try:
+        yield
+    finally:
+        state.use_replica = use_replica
+
+
+class ReplicaPinningMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState(pinned=PRIMARY_PIN_COOKIE in request.COOKIES)
+        current_routing.set(state)
+        response = self.get_response(request)
+
+        if state.wrote and REPLICA_DATABASE in settings.DATABASES:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,195 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+
+logger = logging.getLogger('star_burger.slow_requests')
+
+DURATION_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+current_request_stats = ContextVar('current_request_stats', default=None)
+
+
+class RequestStats:
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.http_time = 0.0
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = defaultdict(lambda: {
+            'requests': 0,
+            'queries': 0,
+            'sql_seconds': 0.0,
+            'http_seconds': 0.0,
+            'duration_seconds': 0.0,
+            'buckets': [0] * len(DURATION_BUCKETS),
+        })
+
+    def record(self, view, stats, duration):
+        with self.lock:
+            view_metrics = self.views[view]
+            view_metrics['requests'] += 1
+            view_metrics['queries'] += stats.queries
+            view_metrics['sql_seconds'] += stats.sql_time
+            view_metrics['http_seconds'] += stats.http_time
+            view_metrics['duration_seconds'] += duration
+            for position, bucket in enumerate(DURATION_BUCKETS):
+                if duration <= bucket:
+                    view_metrics['buckets'][position] += 1
+
+    def render(self):
+        from foodcartapp.utils import geocode_cache_stats
+
+        lines = [
+            '# HELP star_burger_request_duration_seconds Время обработки запроса.',
+            '# TYPE star_burger_request_duration_seconds histogram',
+        ]
+        with self.lock:
+            views = {view: dict(metrics) for view, metrics in self.views.items()}
+
+        for view, metrics in sorted(views.items()):
+            for bucket, count in zip(DURATION_BUCKETS, metrics['buckets']):
+                lines.append(
+                    f'star_burger_request_duration_seconds_bucket{{view="{view}",le="{bucket}"}} {count}'
+                )
+            lines.append(
+                f'star_burger_request_duration_seconds_bucket{{view="{view}",le="+Inf"}} {metrics["requests"]}'
+            )
+            lines.append(f'star_burger_request_duration_seconds_sum{{view="{view}"}} {metrics["duration_seconds"]}')
+            lines.append(f'star_burger_request_duration_seconds_count{{view="{view}"}} {metrics["requests"]}')
+
+        counters = [
+            ('star_burger_sql_queries_total', 'Число SQL-запросов.', 'queries'),
+            ('star_burger_sql_duration_seconds_total', 'Время выполнения SQL.', 'sql_seconds'),
+            ('star_burger_external_http_duration_seconds_total', 'Время запросов к внешним сервисам.', 'http_seconds'),
+        ]
+        for name, description, key in counters:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} counter')
+            for view, metrics in sorted(views.items()):
+                lines.append(f'{name}{{view="{view}"}} {metrics[key]}')
+
+        lines.append('# HELP star_burger_geocode_cache_total Обращения к кэшу геокодера; misses — запросы, ушедшие в геокодер.')
+        lines.append('# TYPE star_burger_geocode_cache_total counter')
+        for result, count in sorted(geocode_cache_stats.items()):
+            lines.append(f'star_burger_geocode_cache_total{{result="{result}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def sql_execute_wrapper(execute, sql, params, many, context):
+    stats = current_request_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started_at = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.sql_time += time.perf_counter() - started_at
+
+
+@contextmanager
+def track_external_call():
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.http_time += time.perf_counter() - started_at
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        for connection in connections.all():
+            if sql_execute_wrapper not in connection.execute_wrappers:
+                connection.execute_wrappers.append(sql_execute_wrapper)
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        try:
+            response = self.get_response(request)
+        except Exception:
+            self.finish(request, stats, token)
+            raise
+
+        if response.streaming:
+            response.streaming_content = self.finish_after_streaming(
+                request, stats, token, response.streaming_content
+            )
+        else:
+            self.finish(request, stats, token)
+        return response
+
+    def finish_after_streaming(self, request, stats, token, content):
+        try:
+            yield from content
+        finally:
+            self.finish(request, stats, token)
+
+    def finish(self, request, stats, token):
+        duration = time.perf_counter() - stats.started_at
+        try:
+            current_request_stats.reset(token)
+        except ValueError:
+            current_request_stats.set(None)
+
+        match = request.resolver_match
+        if match is None:
+            view = 'unresolved'
+        elif match.url_name:
+            view = match.view_name
+        else:
+            view = match._func_path
+        registry.record(view, stats, duration)
+
+        if duration * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            logger.warning(json.dumps({
+                'event': 'slow_request',
+                'view': view,
+                'method': request.method,
+                'path': request.path,
+                'duration_ms': round(duration * 1000, 1),
+                'sql_queries': stats.queries,
+                'sql_ms': round(stats.sql_time * 1000, 1),
+                'external_http_ms': round(stats.http_time * 1000, 1),
+            }, ensure_ascii=False))
+
+
+def metrics_view(request):
+    if settings.METRICS_TOKEN:
+        authorized = constant_time_compare(
+            request.headers.get('Authorization', ''),
+            f'Bearer {settings.METRICS_TOKEN}',
+        )
+    else:
+        authorized = settings.DEBUG
+    if not authorized:
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
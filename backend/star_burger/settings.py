@@ -1,4 +1,6 @@
 import os
+import tempfile
+from datetime import timedelta
 
 import dj_database_url
 
@@ -19,6 +21,21 @@ MEDIA_URL = '/media/'
 SECRET_KEY = env('SECRET_KEY')
 DEBUG = env.bool('DEBUG', True)
 YANDEX_GEOCODER_API_KEY = os.getenv('YANDEX_GEOCODER_API_KEY')
+ORDER_MATCHING_MODE = env.str('ORDER_MATCHING_MODE', 'haversine')
+GEOCODER_CACHE_TTL = timedelta(days=env.int('GEOCODER_CACHE_TTL_DAYS', 90))
+GEOCODER_NEGATIVE_CACHE_TTL = timedelta(
+    hours=env.int('GEOCODER_NEGATIVE_CACHE_TTL_HOURS', 24)
+)
+GEOCODER_API_URL = env.str('GEOCODER_API_URL', 'https://geocode-maps.yandex.ru/1.x')
+GEOCODER_CONCURRENCY = env.int('GEOCODER_CONCURRENCY', 5)
+GEOCODER_RATE_LIMIT = env.float('GEOCODER_RATE_LIMIT', None)
+PLACE_CACHE_SIZE = env.int('PLACE_CACHE_SIZE', 10000)
+IDEMPOTENCY_KEY_TTL = timedelta(hours=env.int('IDEMPOTENCY_KEY_TTL_HOURS', 24))
+ORDERS_ARCHIVE_AFTER_DAYS = env.int('ORDERS_ARCHIVE_AFTER_DAYS', 90)
+ORDERS_BATCH_MAX_SIZE = env.int('ORDERS_BATCH_MAX_SIZE', 1000)
+DELIVERY_RADIUS_KM = env.float('DELIVERY_RADIUS_KM', None)
+SLOW_REQUEST_THRESHOLD_MS = env.int('SLOW_REQUEST_THRESHOLD_MS', 1000)
+METRICS_TOKEN = env.str('METRICS_TOKEN', '')
 
 if DEBUG:
     STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
@@ -45,6 +62,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'star_burger.metrics.RequestMetricsMiddleware',
+    'star_burger.db_router.ReplicaPinningMiddleware',
     'rollbar.contrib.django.middleware.RollbarNotifierMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -102,6 +121,33 @@ DATABASES = {
         conn_health_checks=True,
     )
 }
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['ENGINE'] = 'star_burger.sqlite_backend'
+    DATABASES['default']['TEST'] = {
+        'NAME': os.path.join(tempfile.gettempdir(), 'star_burger_test.sqlite3'),
+    }
+
+REPLICA_DATABASE_URL = env.str('REPLICA_DATABASE_URL', '')
+if REPLICA_DATABASE_URL:
+    DATABASES['replica'] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=600,
+        conn_health_checks=True,
+    )
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['star_burger.db_router.ReplicaRouter']
+REPLICA_PIN_SECONDS = env.int('REPLICA_PIN_SECONDS', 10)
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': env.str(
+            'CACHE_LOCATION',
+            os.path.join(tempfile.gettempdir(), 'star_burger_cache'),
+        ),
+    }
+}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -140,6 +186,14 @@ STATICFILES_DIRS = [
 ]
 
 
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'foodcartapp.renderers.CompactJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+
 ROLLBAR = {
     'access_token': env('ROLLBAR_ACCESS_TOKEN', default=''),
     'environment': env('ROLLBAR_ENVIRONMENT', default='development'),
@@ -149,4 +203,4 @@ ROLLBAR = {
 
 rollbar.init(**ROLLBAR)
 
-SILENCED_SYSTEM_CHECKS = ['urls.W005']
\ No newline at end of file
+SILENCED_SYSTEM_CHECKS = ['urls.W005', 'models.W040']
\ No newline at end of file
@@ -0,0 +1,9 @@
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    # SQLite starts a plain BEGIN as a reader and fails at once instead of
+    # waiting when two such transactions try to write, so take the write
+    # lock up front and let the busy timeout queue concurrent requests.
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
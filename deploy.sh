@@ -16,6 +16,10 @@ echo "[deploy] Запускаю backend и применяю миграции..."
 docker-compose -f docker-compose.prod.yaml up --build -d backend db
 sleep 5
 docker-compose -f docker-compose.prod.yaml exec backend python manage.py migrate
+docker-compose -f docker-compose.prod.yaml exec backend python manage.py seed_banners
+
+echo "[deploy] Запускаю обработчик очереди геокодирования..."
+docker-compose -f docker-compose.prod.yaml up --build -d geocoder
 
 echo "[deploy] Собираю статику Django..."
 docker-compose -f docker-compose.prod.yaml exec backend python manage.py collectstatic --noinput